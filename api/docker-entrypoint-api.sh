@@ -16,7 +16,11 @@ if [ "$#" -eq 0 ] || [ "$1" = "/bin/bash" ]; then
     echo "  - GET /health"
     echo "  - GET /"
     # Run API server in foreground to keep container alive
-    exec python3 /SeleniumBase/api/server.py
+    # (workers, threads and timeouts are set in gunicorn.conf.py)
+    exec gunicorn \
+        --chdir /SeleniumBase/api \
+        --config /SeleniumBase/api/gunicorn.conf.py \
+        server:app
 else
     # If another command is specified, execute it
     exec "$@"
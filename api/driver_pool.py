@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Driver pool for SeleniumBase API
+Keeps warm browser drivers around so requests don't pay the browser startup cost
+"""
+import atexit
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    """Pool of reusable browser drivers, grouped by the options they were created with"""
+    
+    def __init__(self, driver_factory, max_size=0, max_uses=50):
+        """
+        Args:
+            driver_factory: Callable creating a new driver from keyword arguments
+            max_size: Maximum number of idle drivers kept per set of options (0 disables pooling)
+            max_uses: Number of requests a driver serves before it is recycled
+        """
+        self.driver_factory = driver_factory
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self._idle = {}
+        self._info = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+    
+    @property
+    def enabled(self):
+        """Whether drivers are kept for reuse"""
+        return self.max_size > 0
+    
+    def acquire(self, driver_kwargs, session_key=()):
+        """
+        Get an idle driver created with the same options, or start a new one
+        
+        Args:
+            driver_kwargs: Keyword arguments used to create the driver
+            session_key: Hashable settings applied to the driver after creation
+                (window size, timeouts...). Drivers are only reused for
+                requests with the same settings.
+        """
+        key = (tuple(sorted(driver_kwargs.items())), session_key)
+        if self.enabled:
+            try:
+                driver = self._queue(key).get_nowait()
+                logger.info("Reusing pooled driver")
+                return driver
+            except queue.Empty:
+                pass
+        
+        driver = self.driver_factory(**driver_kwargs)
+        with self._lock:
+            self._info[driver] = [key, 0]
+        return driver
+    
+    def release(self, driver, reusable=True):
+        """
+        Return a driver to the pool, or quit it if it can't be reused
+        
+        Args:
+            driver: Driver previously returned by acquire()
+            reusable: False if the driver is in an unknown state (e.g. after an error)
+        """
+        with self._lock:
+            info = self._info.get(driver)
+            if info:
+                info[1] += 1
+        
+        if not (self.enabled and reusable and info) or info[1] >= self.max_uses:
+            self._quit(driver)
+            return
+        
+        try:
+            # Clear browsing state so it doesn't leak into the next request.
+            # Storage is cleared while still on the page's origin, cookies for
+            # every domain the page touched, then the page is unloaded so its
+            # scripts and timers stop using resources while the driver is idle.
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.get('about:blank')
+        except Exception as e:
+            logger.warning(f"Failed to reset pooled driver: {e}")
+            self._quit(driver)
+            return
+        
+        try:
+            self._queue(info[0]).put_nowait(driver)
+        except queue.Full:
+            self._quit(driver)
+    
+    def close(self):
+        """Quit all idle drivers"""
+        with self._lock:
+            queues = list(self._idle.values())
+            self._idle = {}
+        for idle in queues:
+            while True:
+                try:
+                    driver = idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._quit(driver)
+    
+    def _queue(self, key):
+        """Get the idle queue for a set of driver options"""
+        with self._lock:
+            if key not in self._idle:
+                # Last in, first out: the most recently used driver is the
+                # warmest and idle drivers beyond it are the ones to expire
+                self._idle[key] = queue.LifoQueue(maxsize=self.max_size)
+            return self._idle[key]
+    
+    def _quit(self, driver):
+        """Quit a driver and forget about it"""
+        with self._lock:
+            self._info.pop(driver, None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Failed to quit driver: {e}")
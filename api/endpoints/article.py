@@ -2,26 +2,110 @@
 """
 Article endpoint for SeleniumBase API
 """
-from flask import request, jsonify
+from flask import Response, request, jsonify, stream_with_context
 from seleniumbase import Driver
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 from datetime import datetime
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import multiprocessing
+import atexit
+import base64
 import logging
-import hashlib
+import orjson
+import requests
 import time
 import os
 
+from driver_pool import DriverPool
+from memory_cache import MemoryCache
+from keyed_lock import KeyedLock
+
 # Import helper functions
 from helpers import (
-    get_cache_key, get_cached_result, save_to_cache,
-    parse_bool_param, parse_int_param, parse_list_param,
-    extract_meta_tags, extract_article_content, 
-    extract_text_content, extract_published_time
+    get_cache_key, hash_id, get_cached_bytes, save_to_cache, normalize_url,
+    parse_int_param, parse_html, get_blocked_url_patterns,
+    parse_resource_filter, has_article_markup
 )
+from params import ArticleParams
 
 logger = logging.getLogger(__name__)
 
+# Quality of WebP screenshots (0-100)
+SCREENSHOT_WEBP_QUALITY = 85
+
+# Settings for fetching pages without a browser (browser=false)
+STATIC_FETCH_TIMEOUT = 10
+# Hosts and connections per host kept open by the HTTP session. Request threads
+# and batch requests fetch concurrently, more than requests' default of 10.
+STATIC_POOL_SIZE = 20
+STATIC_USER_AGENT = (
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# Waiting for lazy-loaded content after scrolling: maximum wait and polling
+# interval in seconds
+SCROLL_MAX_WAIT = 0.5
+IDLE_POLL_INTERVAL = 0.1
+
+# True once the page is loaded and the images in the viewport have loaded
+PAGE_IDLE_JS = """
+return document.readyState === 'complete' && Array.from(document.images).every(function (img) {
+    var rect = img.getBoundingClientRect();
+    return img.complete || rect.bottom < 0 || rect.top > window.innerHeight;
+});
+"""
+
+
+def wait_for_page_idle(driver, max_wait):
+    """
+    Wait until the page has finished loading, for at most max_wait seconds
+    
+    The page is first given one polling interval to start the requests
+    triggered by the last action (e.g. lazy-loaded images after scrolling).
+    """
+    deadline = time.monotonic() + max_wait
+    while True:
+        time.sleep(min(IDLE_POLL_INTERVAL, max(0, deadline - time.monotonic())))
+        if time.monotonic() >= deadline:
+            return
+        try:
+            if driver.execute_script(PAGE_IDLE_JS):
+                return
+        except Exception as e:
+            logger.warning(f"Failed to check if page is idle: {e}")
+            return
+
+
+def read_user_script(script_path, cache):
+    """
+    Get the code of a user script, read from disk only when the file changed
+    
+    Args:
+        script_path: Path of the script file
+        cache: Dict of script contents by path, as (modification time and size, code)
+    
+    Returns:
+        The script code, or None if the script doesn't exist
+    """
+    try:
+        stat = script_path.stat()
+    except OSError:
+        return None
+    
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = cache.get(script_path)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    try:
+        script_code = script_path.read_text()
+    except OSError:
+        return None
+    cache[script_path] = (version, script_code)
+    return script_code
+
 
 def register_routes(app, cache_dir, user_scripts_dir, screenshots_dir, 
                     default_cache, default_full_content, default_screenshot,
@@ -32,9 +116,399 @@ def register_routes(app, cache_dir, user_scripts_dir, screenshots_dir,
                     default_device, default_scroll_down, default_ignore_https_errors,
                     default_user_agent, default_locale, default_timezone,
                     default_http_credentials, default_extra_http_headers,
-                    default_cache_ttl):
+                    default_cache_ttl, driver_pool_size=0, driver_max_uses=50,
+                    batch_max_concurrency=5, parse_workers=0, default_browser=True,
+                    memory_cache_size_mb=0, screenshot_inline=False, default_text=True):
     """Register article routes with the Flask app"""
     
+    # Settings used for parameters that are not set on a request
+    default_params = ArticleParams(
+        cache=default_cache,
+        full_content=default_full_content,
+        screenshot=default_screenshot,
+        user_scripts=default_user_scripts,
+        user_scripts_timeout=default_user_scripts_timeout,
+        browser=default_browser,
+        text=default_text,
+        incognito=default_incognito,
+        timeout=default_timeout,
+        wait_until=default_wait_until,
+        sleep=default_sleep,
+        resource=default_resource,
+        viewport_width=parse_int_param(default_viewport_width, None),
+        viewport_height=parse_int_param(default_viewport_height, None),
+        screen_width=parse_int_param(default_screen_width, None),
+        screen_height=parse_int_param(default_screen_height, None),
+        device=default_device,
+        scroll_down=default_scroll_down,
+        ignore_https_errors=default_ignore_https_errors,
+        user_agent=default_user_agent,
+        locale=default_locale,
+        timezone=default_timezone,
+        http_credentials=default_http_credentials,
+        extra_http_headers=default_extra_http_headers
+    )
+    
+    # Pool of warm browser drivers shared by all requests of this worker.
+    # Driver is looked up on each call so it can be patched in tests.
+    driver_pool = DriverPool(
+        lambda **kwargs: Driver(**kwargs),
+        max_size=driver_pool_size,
+        max_uses=driver_max_uses
+    )
+    # Exposed so the gunicorn worker_exit hook can quit idle drivers
+    app.extensions['driver_pool'] = driver_pool
+    
+    # Recently used cache entries kept in memory (per worker process)
+    memory_cache = MemoryCache(memory_cache_size_mb * 1024 * 1024) if memory_cache_size_mb > 0 else None
+    
+    # Optional pool of processes parsing fetched pages off the request thread.
+    # Its processes start on the first submit, from a request thread. Forking
+    # a process with running threads can deadlock the child on a lock held at
+    # fork time, so they are forked from a clean forkserver process instead,
+    # which imports the parsing helpers once.
+    parse_pool = None
+    if parse_workers > 0:
+        mp_context = multiprocessing.get_context('forkserver')
+        mp_context.set_forkserver_preload(['helpers'])
+        parse_pool = ProcessPoolExecutor(
+            max_workers=parse_workers,
+            mp_context=mp_context
+        )
+        atexit.register(parse_pool.shutdown)
+    
+    # Locks letting a single request fetch a page missing from the cache
+    fetch_locks = KeyedLock()
+    
+    # Connection-pooled HTTP session for pages fetched without a browser
+    http_session = requests.Session()
+    http_adapter = requests.adapters.HTTPAdapter(
+        pool_connections=STATIC_POOL_SIZE,
+        pool_maxsize=STATIC_POOL_SIZE
+    )
+    http_session.mount('http://', http_adapter)
+    http_session.mount('https://', http_adapter)
+    
+    # User script contents by path, as (modification time and size, code)
+    user_script_cache = {}
+    
+    def fetch_static_page(url, params):
+        """
+        Fetch a server-rendered page with a plain HTTP request
+        
+        Returns:
+            Tuple of (final URL after redirects, page HTML, None), or None when
+            the page needs a browser (request failed, not HTML or no article markup)
+        """
+        try:
+            response = http_session.get(
+                url,
+                headers={'User-Agent': params.user_agent or STATIC_USER_AGENT},
+                timeout=STATIC_FETCH_TIMEOUT
+            )
+        except Exception as e:
+            logger.info(f"HTTP fetch failed, falling back to browser: {e}")
+            return None
+        
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code != 200 or 'html' not in content_type:
+            logger.info(f"HTTP fetch returned {response.status_code} ({content_type}), falling back to browser")
+            return None
+        
+        # requests assumes ISO-8859-1 for text without a charset
+        if 'charset' not in content_type:
+            response.encoding = 'utf-8'
+        html_content = response.text
+        
+        if not has_article_markup(html_content):
+            logger.info("No article markup in HTTP response, falling back to browser")
+            return None
+        
+        logger.info(f"Fetched {len(html_content)} bytes from {url} without browser")
+        return response.url, html_content, None
+    
+    def fetch_page(url, params, cache_key):
+        """
+        Load a page in a pooled browser
+        
+        Returns:
+            Tuple of (final URL after redirects, page HTML, screenshot URI or None)
+        """
+        logger.info(f"Fetching URL: {url}")
+        
+        # Detect browser type: Chromium vs Chrome (Chromium is used for arm64 arch)
+        # If /usr/bin/chromium-browser exists, we're using Chromium (uc=False)
+        # Otherwise, we're using Chrome (uc=True)
+        is_chromium = os.path.exists('/usr/bin/chromium-browser')
+        use_uc_mode = not is_chromium
+        
+        logger.info(f"Browser detected: {'Chromium' if is_chromium else 'Chrome'}, uc mode: {use_uc_mode}")
+        
+        # Initialize SeleniumBase Driver with configuration
+        driver_kwargs = {
+            'browser': 'chrome',
+            'headless': True,
+            'uc': use_uc_mode,
+            'incognito': params.incognito,
+        }
+        
+        # Also disable images in the browser itself when they aren't allowed:
+        # this catches images the URL patterns miss (no file extension,
+        # data: URIs) and applies from the moment the browser starts
+        allowed_resources = parse_resource_filter(params.resource)
+        if allowed_resources is not None and 'image' not in allowed_resources:
+            driver_kwargs['block_images'] = True
+        
+        # Note: SeleniumBase Driver may not support all these options directly
+        # We'll use what's available and log warnings for unsupported features
+        
+        driver = None
+        driver_reusable = False
+        try:
+            # Drivers are only reused for requests with the same window size,
+            # timeout and blocked resources
+            driver = driver_pool.acquire(
+                driver_kwargs,
+                session_key=(params.viewport_width, params.viewport_height, params.timeout, params.resource)
+            )
+            
+            # Block resource types that aren't allowed before navigating, so the
+            # browser doesn't download and render them
+            blocked_urls = get_blocked_url_patterns(params.resource)
+            if blocked_urls:
+                try:
+                    driver.execute_cdp_cmd('Network.enable', {})
+                    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_urls})
+                except Exception as e:
+                    logger.warning(f"Failed to block resources: {e}")
+            
+            # Set timeout (convert milliseconds to seconds)
+            if params.timeout > 0:
+                driver.set_page_load_timeout(params.timeout / 1000.0)
+            
+            # Set viewport size if specified
+            if params.viewport_width and params.viewport_height:
+                driver.set_window_size(params.viewport_width, params.viewport_height)
+            
+            # Navigate to the URL
+            driver.get(url)
+            
+            # Run user scripts if specified
+            if params.user_scripts:
+                script_names = [s.strip() for s in params.user_scripts.split(',') if s.strip()]
+                for script_name in script_names:
+                    script_code = read_user_script(user_scripts_dir / script_name, user_script_cache)
+                    if script_code is not None:
+                        try:
+                            driver.execute_script(script_code)
+                            logger.info(f"Executed user script: {script_name}")
+                        except Exception as e:
+                            logger.warning(f"Failed to execute user script {script_name}: {e}")
+                    else:
+                        logger.warning(f"User script not found: {script_name}")
+                
+                # Wait after user scripts
+                if params.user_scripts_timeout > 0:
+                    time.sleep(params.user_scripts_timeout / 1000.0)
+            
+            # Sleep if specified
+            if params.sleep > 0:
+                time.sleep(params.sleep / 1000.0)
+            
+            # Scroll down if specified
+            if params.scroll_down > 0:
+                driver.execute_script(f"window.scrollBy(0, {params.scroll_down});")
+                # Give time for lazy-loaded content, but stop waiting as soon
+                # as it has loaded
+                wait_for_page_idle(driver, SCROLL_MAX_WAIT)
+            
+            # Get the final URL after redirects
+            final_url = driver.current_url
+            
+            # Get the page HTML
+            html_content = driver.page_source
+            
+            # Take screenshot if requested
+            screenshot_uri = None
+            if params.screenshot:
+                try:
+                    # Let Chrome encode WebP natively via CDP: it is faster to
+                    # encode and several times smaller than the default PNG
+                    try:
+                        result = driver.execute_cdp_cmd(
+                            'Page.captureScreenshot',
+                            {'format': 'webp', 'quality': SCREENSHOT_WEBP_QUALITY}
+                        )
+                        if screenshot_inline:
+                            # CDP already returns base64, embed it as is
+                            screenshot_uri = f"data:image/webp;base64,{result['data']}"
+                        else:
+                            screenshot_filename = f"{cache_key}.webp"
+                            (screenshots_dir / screenshot_filename).write_bytes(base64.b64decode(result['data']))
+                            # The screenshot endpoint prefers WebP, drop any older PNG for the page anyway
+                            (screenshots_dir / f"{cache_key}.png").unlink(missing_ok=True)
+                            screenshot_uri = f"/api/screenshot/{cache_key}"
+                            logger.info(f"Screenshot saved: {screenshot_filename}")
+                    except Exception as e:
+                        logger.warning(f"Failed to capture WebP screenshot, falling back to PNG: {e}")
+                    
+                    # Fall back to the driver's PNG screenshot (e.g. browsers without CDP)
+                    if not screenshot_uri:
+                        try:
+                            if screenshot_inline:
+                                screenshot_uri = f"data:image/png;base64,{driver.get_screenshot_as_base64()}"
+                            else:
+                                screenshot_filename = f"{cache_key}.png"
+                                driver.save_screenshot(str(screenshots_dir / screenshot_filename))
+                                # Otherwise an older WebP of the page would still be served
+                                (screenshots_dir / f"{cache_key}.webp").unlink(missing_ok=True)
+                                screenshot_uri = f"/api/screenshot/{cache_key}"
+                                logger.info(f"Screenshot saved: {screenshot_filename}")
+                        except Exception as e:
+                            logger.warning(f"Failed to save screenshot: {e}")
+                            screenshot_uri = None
+                except Exception as e:
+                    logger.warning(f"Screenshot failed: {e}")
+            
+            logger.info(f"Successfully fetched {len(html_content)} bytes from {url}")
+            driver_reusable = True
+        
+        finally:
+            # Always release the driver: it is returned to the pool if pooling
+            # is enabled and the request succeeded, otherwise it is closed
+            if driver:
+                driver_pool.release(driver, driver_reusable)
+        
+        return final_url, html_content, screenshot_uri
+    
+    def fetch_article(url, args, params, cache_key, accept_zstd):
+        """
+        Fetch and parse a page, then cache and serialize the result
+        
+        Returns:
+            Tuple of (response body, status code, content encoding), as scrape_article
+        """
+        # Try a plain HTTP request first when the browser isn't required.
+        # Screenshots, user scripts, scrolling and waiting always need the browser.
+        fetched = None
+        if (not params.browser and not params.screenshot and not params.user_scripts
+                and not params.scroll_down and not params.sleep):
+            fetched = fetch_static_page(url, params)
+        if fetched is None:
+            fetched = fetch_page(url, params, cache_key)
+        final_url, html_content, screenshot_uri = fetched
+        
+        # The driver is back in the pool at this point, so parsing (pure CPU
+        # work) doesn't hold up the next browser request. With a parse pool
+        # it also runs on another core instead of contending for the GIL.
+        if parse_pool:
+            parsed = parse_pool.submit(parse_html, html_content, params.text).result()
+        else:
+            parsed = parse_html(html_content, params.text)
+        
+        # Only keep the page HTML if it is returned, so a large page is freed
+        # before the response is built and serialized
+        full_content = html_content if params.full_content else None
+        del html_content, fetched
+        
+        # Generate unique ID
+        result_id = hash_id(final_url)
+        
+        # Parse domain
+        domain = urlsplit(final_url).netloc
+        
+        # Get current date in ISO format
+        current_date = datetime.utcnow().isoformat() + 'Z'
+        
+        # Build query object
+        query = {'url': url}
+        query.update({k: v for k, v in args.items() if k != 'url'})
+        
+        # Build result URI
+        result_uri = f"api://article/{result_id}"
+        
+        # Build response
+        response = {
+            'id': result_id,
+            'url': final_url,
+            'domain': domain,
+            'title': parsed['title'],
+            'byline': parsed['byline'],
+            'excerpt': parsed['excerpt'],
+            'siteName': parsed['siteName'],
+            'content': parsed['content'],
+            'textContent': parsed['textContent'],
+            'length': parsed['length'],
+            'lang': parsed['lang'],
+            'dir': parsed['dir'],
+            'publishedTime': parsed['publishedTime'],
+            'fullContent': full_content,
+            'date': current_date,
+            'query': query,
+            'meta': parsed['meta'],
+            'resultUri': result_uri,
+            'screenshotUri': screenshot_uri
+        }
+        
+        # Serialize once with orjson (much faster than the stdlib encoder on
+        # large HTML strings); the same bytes are cached and served
+        body = orjson.dumps(response)
+        compressed = save_to_cache(cache_key, body, cache_dir, memory_cache)
+        
+        if accept_zstd and compressed:
+            return compressed, 200, 'zstd'
+        return body, 200, None
+    
+    def scrape_article(url, args, accept_zstd=False):
+        """
+        Fetch article content and metadata for a single URL
+        
+        Args:
+            url: Page URL to fetch
+            args: Mapping of the other request parameters, as documented on get_article
+            accept_zstd: Whether the result may be returned zstd-compressed
+        
+        Returns:
+            Tuple of (response body, status code, content encoding). The body is
+            the serialized JSON bytes of the result (compressed if the encoding
+            is 'zstd'), or an error dict.
+        """
+        try:
+            # Parse all request parameters in a single pass
+            params = ArticleParams.from_args(args, default_params)
+            
+            # Generate cache key (equivalent URLs share the same key)
+            cache_key = get_cache_key(normalize_url(url), params.cache_query())
+            
+            # Concurrent requests for the same uncached page wait for the
+            # first one to fetch it and are then served from the cache
+            with fetch_locks.hold(cache_key) if params.cache else nullcontext():
+                # Check cache if enabled
+                if params.cache:
+                    # Cached entries are stored in their serialized form, so they
+                    # are served as-is without a parse/re-serialize round trip (and
+                    # without decompressing them for clients accepting zstd)
+                    cached_bytes = get_cached_bytes(
+                        cache_key, cache_dir, default_cache_ttl,
+                        compressed=accept_zstd, memory_cache=memory_cache
+                    )
+                    if cached_bytes:
+                        logger.info(f"Returning cached result for URL: {url}")
+                        return cached_bytes, 200, 'zstd' if accept_zstd else None
+                
+                return fetch_article(url, args, params, cache_key, accept_zstd)
+                
+        except Exception as e:
+            logger.error(f"Error fetching URL {url}: {str(e)}", exc_info=True)
+            return {
+                'detail': [
+                    {
+                        'type': 'fetch_error',
+                        'msg': f'Failed to fetch URL: {str(e)}'
+                    }
+                ]
+            }, 500, None
+    
     @app.route('/api/article', methods=['GET'])
     def get_article():
         """
@@ -48,6 +522,7 @@ def register_routes(app, cache_dir, user_scripts_dir, screenshots_dir,
             - screenshot (bool): Take screenshot of the page
             - user-scripts (str): Comma-separated list of user scripts to run
             - user-scripts-timeout (int): Wait time after user scripts in milliseconds
+            - text (bool): Extract the text content (textContent and length)
             
             Browser settings:
             - incognito (bool): Use incognito mode
@@ -83,285 +558,71 @@ def register_routes(app, cache_dir, user_scripts_dir, screenshots_dir,
                 ]
             }), 400
         
-        try:
-            # Parse scraper parameters
-            use_cache = parse_bool_param(request.args.get('cache'), default_cache)
-            full_content = parse_bool_param(request.args.get('full-content'), default_full_content)
-            screenshot = parse_bool_param(request.args.get('screenshot'), default_screenshot)
-            user_scripts = parse_list_param(request.args.get('user-scripts'), default_user_scripts)
-            user_scripts_timeout = parse_int_param(request.args.get('user-scripts-timeout'), default_user_scripts_timeout)
-            
-            # Parse browser parameters
-            incognito = parse_bool_param(request.args.get('incognito'), default_incognito)
-            timeout = parse_int_param(request.args.get('timeout'), default_timeout)
-            wait_until = request.args.get('wait-until', default_wait_until)
-            sleep_time = parse_int_param(request.args.get('sleep'), default_sleep)
-            resource_filter = parse_list_param(request.args.get('resource'), default_resource)
-            viewport_width = parse_int_param(request.args.get('viewport-width'), None) if request.args.get('viewport-width', default_viewport_width) else None
-            viewport_height = parse_int_param(request.args.get('viewport-height'), None) if request.args.get('viewport-height', default_viewport_height) else None
-            screen_width = parse_int_param(request.args.get('screen-width'), None) if request.args.get('screen-width', default_screen_width) else None
-            screen_height = parse_int_param(request.args.get('screen-height'), None) if request.args.get('screen-height', default_screen_height) else None
-            device = request.args.get('device', default_device)
-            scroll_down = parse_int_param(request.args.get('scroll-down'), default_scroll_down)
-            ignore_https_errors = parse_bool_param(request.args.get('ignore-https-errors'), default_ignore_https_errors)
-            user_agent = request.args.get('user-agent', default_user_agent)
-            locale = request.args.get('locale', default_locale)
-            timezone = request.args.get('timezone', default_timezone)
-            http_credentials = request.args.get('http-credentials', default_http_credentials)
-            extra_http_headers = request.args.get('extra-http-headers', default_extra_http_headers)
-            
-            # Build query object for cache key
-            # Note: 'cache' parameter is excluded because it doesn't affect content
-            query_params = {
-                'full-content': full_content,
-                'screenshot': screenshot,
-                'user-scripts': user_scripts,
-                'user-scripts-timeout': user_scripts_timeout,
-                'incognito': incognito,
-                'timeout': timeout,
-                'wait-until': wait_until,
-                'sleep': sleep_time,
-                'resource': resource_filter,
-                'viewport-width': viewport_width,
-                'viewport-height': viewport_height,
-                'screen-width': screen_width,
-                'screen-height': screen_height,
-                'device': device,
-                'scroll-down': scroll_down,
-                'ignore-https-errors': ignore_https_errors,
-                'user-agent': user_agent,
-                'locale': locale,
-                'timezone': timezone,
-            }
-            
-            # Generate cache key
-            cache_key = get_cache_key(url, query_params)
-            
-            # Check cache if enabled
-            if use_cache:
-                cached_result = get_cached_result(cache_key, cache_dir, default_cache_ttl)
-                if cached_result:
-                    logger.info(f"Returning cached result for URL: {url}")
-                    return jsonify(cached_result), 200
-            
-            logger.info(f"Fetching URL: {url}")
-            
-            # Detect browser type: Chromium vs Chrome (Chromium is used for arm64 arch)
-            # If /usr/bin/chromium-browser exists, we're using Chromium (uc=False)
-            # Otherwise, we're using Chrome (uc=True)
-            is_chromium = os.path.exists('/usr/bin/chromium-browser')
-            use_uc_mode = not is_chromium
-            
-            logger.info(f"Browser detected: {'Chromium' if is_chromium else 'Chrome'}, uc mode: {use_uc_mode}")
-            
-            # Initialize SeleniumBase Driver with configuration
-            driver_kwargs = {
-                'browser': 'chrome',
-                'headless': True,
-                'uc': use_uc_mode,
-                'incognito': incognito,
-            }
-            
-            # Note: SeleniumBase Driver may not support all these options directly
-            # We'll use what's available and log warnings for unsupported features
-            
-            driver = None
-            try:
-                driver = Driver(**driver_kwargs)
-                
-                # Set timeout (convert milliseconds to seconds)
-                if timeout > 0:
-                    driver.set_page_load_timeout(timeout / 1000.0)
-                
-                # Set viewport size if specified
-                if viewport_width and viewport_height:
-                    driver.set_window_size(viewport_width, viewport_height)
-                
-                # Navigate to the URL
-                driver.get(url)
-                
-                # Run user scripts if specified
-                if user_scripts:
-                    script_names = [s.strip() for s in user_scripts.split(',') if s.strip()]
-                    for script_name in script_names:
-                        script_path = user_scripts_dir / script_name
-                        if script_path.exists():
-                            try:
-                                with open(script_path, 'r') as f:
-                                    script_code = f.read()
-                                driver.execute_script(script_code)
-                                logger.info(f"Executed user script: {script_name}")
-                            except Exception as e:
-                                logger.warning(f"Failed to execute user script {script_name}: {e}")
-                        else:
-                            logger.warning(f"User script not found: {script_name}")
-                    
-                    # Wait after user scripts
-                    if user_scripts_timeout > 0:
-                        time.sleep(user_scripts_timeout / 1000.0)
-                
-                # Sleep if specified
-                if sleep_time > 0:
-                    time.sleep(sleep_time / 1000.0)
-                
-                # Scroll down if specified
-                if scroll_down > 0:
-                    driver.execute_script(f"window.scrollBy(0, {scroll_down});")
-                    # Give time for lazy-loaded content
-                    time.sleep(0.5)
-                
-                # Get the final URL after redirects
-                final_url = driver.current_url
-                
-                # Get the page HTML
-                html_content = driver.page_source
-                
-                # Take screenshot if requested
-                screenshot_uri = None
-                if screenshot:
-                    try:
-                        screenshot_filename = f"{cache_key}.png"
-                        screenshot_path = screenshots_dir / screenshot_filename
-                        
-                        # Try full page screenshot first
-                        try:
-                            driver.save_screenshot(str(screenshot_path))
-                            screenshot_uri = f"file://screenshots/{screenshot_filename}"
-                            logger.info(f"Screenshot saved: {screenshot_filename}")
-                        except Exception as e:
-                            logger.warning(f"Failed to save screenshot: {e}")
-                            screenshot_uri = None
-                    except Exception as e:
-                        logger.warning(f"Screenshot failed: {e}")
-                
-                logger.info(f"Successfully fetched {len(html_content)} bytes from {url}")
-                
-            finally:
-                # Always close the driver
-                if driver:
-                    driver.quit()
-            
-            # Parse HTML with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Extract title
-            title = None
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.get_text(strip=True)
-            
-            # Try Open Graph title
-            if not title:
-                og_title = soup.find('meta', property='og:title')
-                if og_title:
-                    title = og_title.get('content')
-            
-            # Extract description/excerpt
-            excerpt = None
-            desc_tag = soup.find('meta', attrs={'name': 'description'})
-            if desc_tag:
-                excerpt = desc_tag.get('content')
-            
-            if not excerpt:
-                og_desc = soup.find('meta', property='og:description')
-                if og_desc:
-                    excerpt = og_desc.get('content')
-            
-            # Extract byline/author
-            byline = None
-            author_tag = soup.find('meta', attrs={'name': 'author'})
-            if author_tag:
-                byline = author_tag.get('content')
-            
-            if not byline:
-                article_author = soup.find('meta', property='article:author')
-                if article_author:
-                    byline = article_author.get('content')
-            
-            # Extract site name
-            site_name = None
-            og_site_name = soup.find('meta', property='og:site_name')
-            if og_site_name:
-                site_name = og_site_name.get('content')
-            
-            # Extract language
-            lang = None
-            html_tag = soup.find('html')
-            if html_tag:
-                lang = html_tag.get('lang')
-            
-            # Extract direction
-            dir_attr = None
-            if html_tag:
-                dir_attr = html_tag.get('dir')
-            
-            # Extract article content
-            content = extract_article_content(soup)
-            
-            # Extract text content
-            text_content = extract_text_content(soup)
-            
-            # Calculate content length
-            length = len(text_content) if text_content else None
-            
-            # Extract meta tags
-            meta = extract_meta_tags(soup)
-            
-            # Extract published time
-            published_time = extract_published_time(soup)
-            
-            # Generate unique ID
-            result_id = hashlib.md5(final_url.encode()).hexdigest()
-            
-            # Parse domain
-            parsed_url = urlparse(final_url)
-            domain = parsed_url.netloc
-            
-            # Get current date in ISO format
-            current_date = datetime.utcnow().isoformat() + 'Z'
-            
-            # Build query object
-            query = {'url': url}
-            query.update({k: v for k, v in request.args.items() if k != 'url'})
-            
-            # Build result URI
-            result_uri = f"api://article/{result_id}"
-            
-            # Build response
-            response = {
-                'id': result_id,
-                'url': final_url,
-                'domain': domain,
-                'title': title,
-                'byline': byline,
-                'excerpt': excerpt,
-                'siteName': site_name,
-                'content': content,
-                'textContent': text_content,
-                'length': length,
-                'lang': lang,
-                'dir': dir_attr,
-                'publishedTime': published_time,
-                'fullContent': html_content if full_content else None,
-                'date': current_date,
-                'query': query,
-                'meta': meta,
-                'resultUri': result_uri,
-                'screenshotUri': screenshot_uri
-            }
-            
-            # Save to cache
-            save_to_cache(cache_key, response, cache_dir)
-            
-            return jsonify(response), 200
-                
-        except Exception as e:
-            logger.error(f"Error fetching URL {url}: {str(e)}", exc_info=True)
+        body, status, content_encoding = scrape_article(
+            url, request.args, accept_zstd='zstd' in request.accept_encodings
+        )
+        if isinstance(body, bytes):
+            # Results (fresh or cached) are already serialized and served as-is
+            response = Response(body, mimetype='application/json')
+            response.vary.add('Accept-Encoding')
+            if content_encoding:
+                response.content_encoding = content_encoding
+            return response, status
+        return jsonify(body), status
+    
+    @app.route('/api/article/batch', methods=['POST'])
+    def get_article_batch():
+        """
+        Fetch article content and metadata from several URLs concurrently
+        
+        JSON Body:
+            - urls (list, required): Page URLs to fetch
+            - max_concurrency (int): Number of URLs fetched in parallel
+              (capped by BATCH_MAX_CONCURRENCY)
+            - Any /api/article query parameter (e.g. "screenshot", "sleep"),
+              applied to every URL
+        
+        Returns:
+            NDJSON stream with one {"index", "url", "status", "result"} line per URL,
+            written as soon as each URL completes
+        """
+        payload = request.get_json(silent=True)
+        urls = payload.get('urls') if isinstance(payload, dict) else None
+        
+        if not urls or not isinstance(urls, list) or not all(isinstance(url, str) and url for url in urls):
             return jsonify({
                 'detail': [
                     {
-                        'type': 'fetch_error',
-                        'msg': f'Failed to fetch URL: {str(e)}'
+                        'type': 'missing_parameter',
+                        'msg': 'Missing required parameter: urls (non-empty list of URLs)'
                     }
                 ]
-            }), 500
+            }), 400
+        
+        max_concurrency = parse_int_param(payload.get('max_concurrency'), batch_max_concurrency)
+        max_concurrency = max(1, min(max_concurrency, batch_max_concurrency, len(urls)))
+        
+        # Remaining body fields are shared options, named like the query parameters
+        args = {k: v for k, v in payload.items() if k not in ('urls', 'max_concurrency', 'url')}
+        
+        def generate():
+            executor = ThreadPoolExecutor(max_workers=max_concurrency)
+            try:
+                futures = {
+                    executor.submit(scrape_article, url, args): index
+                    for index, url in enumerate(urls)
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    body, status, _ = future.result()
+                    # Results are already serialized and spliced in as-is
+                    if not isinstance(body, bytes):
+                        body = orjson.dumps(body)
+                    yield b'{"index":%d,"url":%s,"status":%d,"result":%s}\n' % (
+                        index, orjson.dumps(urls[index]), status, body
+                    )
+            finally:
+                # Don't start queued URLs if the client went away
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson'), 200
@@ -2,7 +2,14 @@
 """
 Health check endpoint for SeleniumBase API
 """
-from flask import jsonify
+from flask import Response
+import orjson
+
+# The response never changes, so it is serialized once
+HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'service': 'seleniumbase-api'
+})
 
 
 def register_routes(app):
@@ -11,7 +18,4 @@ def register_routes(app):
     @app.route('/health', methods=['GET'])
     def health_check():
         """Health check endpoint"""
-        return jsonify({
-            'status': 'healthy',
-            'service': 'seleniumbase-api'
-        }), 200
+        return Response(HEALTH_BODY, status=200, mimetype='application/json')
@@ -2,7 +2,40 @@
 """
 Root endpoint for SeleniumBase API
 """
-from flask import jsonify
+from flask import Response
+import orjson
+
+# API documentation served by the root endpoint, serialized once
+INDEX_BODY = orjson.dumps({
+    'service': 'SeleniumBase API',
+    'version': '1.0.0',
+    'endpoints': {
+        '/api/article': {
+            'method': 'GET',
+            'description': 'Fetch HTML content from a URL',
+            'parameters': {
+                'url': 'The URL to fetch (required)'
+            },
+            'example': '/api/article?url=https://en.wikipedia.org/wiki/web_scraping'
+        },
+        '/api/article/batch': {
+            'method': 'POST',
+            'description': 'Fetch several URLs concurrently, streaming NDJSON results',
+            'parameters': {
+                'urls': 'JSON list of URLs to fetch (required)',
+                'max_concurrency': 'Number of URLs fetched in parallel'
+            }
+        },
+        '/api/screenshot/<key>': {
+            'method': 'GET',
+            'description': 'Fetch a page screenshot (screenshotUri of an article result)'
+        },
+        '/health': {
+            'method': 'GET',
+            'description': 'Health check endpoint'
+        }
+    }
+})
 
 
 def register_routes(app):
@@ -11,21 +44,4 @@ def register_routes(app):
     @app.route('/', methods=['GET'])
     def index():
         """Root endpoint with API documentation"""
-        return jsonify({
-            'service': 'SeleniumBase API',
-            'version': '1.0.0',
-            'endpoints': {
-                '/api/article': {
-                    'method': 'GET',
-                    'description': 'Fetch HTML content from a URL',
-                    'parameters': {
-                        'url': 'The URL to fetch (required)'
-                    },
-                    'example': '/api/article?url=https://en.wikipedia.org/wiki/web_scraping'
-                },
-                '/health': {
-                    'method': 'GET',
-                    'description': 'Health check endpoint'
-                }
-            }
-        }), 200
+        return Response(INDEX_BODY, status=200, mimetype='application/json')
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Screenshot endpoint for SeleniumBase API
+"""
+from flask import jsonify, send_from_directory
+import re
+
+# Screenshot names are cache keys (hex digests)
+SCREENSHOT_KEY_RE = re.compile(r'[0-9a-f]+')
+
+# Screenshot formats, in order of preference
+SCREENSHOT_EXTENSIONS = ('.webp', '.png')
+
+
+def register_routes(app, screenshots_dir):
+    """Register screenshot routes with the Flask app"""
+    
+    @app.route('/api/screenshot/<key>', methods=['GET'])
+    def get_screenshot(key):
+        """
+        Serve a page screenshot taken by /api/article
+        
+        The file is sent with sendfile() where available, and supports
+        conditional requests (ETag / If-Modified-Since).
+        """
+        if SCREENSHOT_KEY_RE.fullmatch(key):
+            for extension in SCREENSHOT_EXTENSIONS:
+                filename = f"{key}{extension}"
+                if (screenshots_dir / filename).is_file():
+                    return send_from_directory(screenshots_dir, filename, conditional=True, max_age=3600)
+        
+        return jsonify({
+            'detail': [
+                {
+                    'type': 'not_found',
+                    'msg': f'Screenshot not found: {key}'
+                }
+            ]
+        }), 404
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Gunicorn configuration for SeleniumBase API
+Used by docker-entrypoint-api.sh, settings are read from environment variables
+"""
+import os
+
+# Server socket
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '3000')}"
+
+# Selenium calls block, so concurrency comes from worker processes and threads.
+# Each concurrent request runs its own browser, keep workers x threads modest.
+worker_class = 'gthread'
+workers = int(os.getenv('API_WORKERS', '2'))
+threads = int(os.getenv('API_THREADS', '4'))
+
+# Slow pages, user scripts and scrolling can take minutes
+timeout = int(os.getenv('API_TIMEOUT', '300'))
+
+# Restart workers periodically to reclaim memory and browser processes leaked
+# by crashed drivers. The jitter keeps workers from restarting all at once.
+max_requests = int(os.getenv('API_MAX_REQUESTS', '100'))
+max_requests_jitter = int(os.getenv('API_MAX_REQUESTS_JITTER', '20'))
+
+
+def worker_exit(server, worker):
+    """Quit the worker's idle pooled browsers so no Chrome processes are left behind"""
+    app = getattr(worker, 'wsgi', None)
+    driver_pool = getattr(app, 'extensions', {}).get('driver_pool')
+    if driver_pool is not None:
+        driver_pool.close()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+JSON provider for SeleniumBase API
+Serializes jsonify() responses and parses request bodies with orjson instead of the stdlib json module
+"""
+from flask.json.provider import DefaultJSONProvider
+import orjson
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, keeping Flask's key sorting and pretty-printing settings"""
+    
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string"""
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON string or bytes"""
+        return orjson.loads(s)
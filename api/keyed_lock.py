@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Per-key locking for SeleniumBase API
+Lets concurrent requests for the same page wait for a single fetch instead of all fetching it
+"""
+from contextlib import contextmanager
+import threading
+
+
+class KeyedLock:
+    """Thread-safe collection of locks created on demand per key"""
+    
+    def __init__(self):
+        self._locks = {}
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def hold(self, key):
+        """Hold the lock for a key, waiting for other threads holding it"""
+        with self._lock:
+            entry = self._locks.get(key)
+            if entry is None:
+                # [lock, number of threads holding or waiting for it]
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        
+        try:
+            with entry[0]:
+                yield
+        finally:
+            # Forget the lock once nobody uses it so keys don't accumulate
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+    
+    def __len__(self):
+        """Number of keys currently locked or waited for"""
+        with self._lock:
+            return len(self._locks)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+In-memory cache for SeleniumBase API
+Keeps recently used cache entries in memory so hot URLs are served without disk reads
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class MemoryCache:
+    """Thread-safe LRU cache of serialized results, bounded by their total size"""
+    
+    def __init__(self, max_bytes):
+        """
+        Args:
+            max_bytes: Maximum total size of the cached values (0 disables caching)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key, ttl):
+        """Get a value cached less than ttl seconds ago, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            timestamp, value = entry
+            if time.time() - timestamp > ttl:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value, timestamp=None):
+        """
+        Cache a value, evicting the least recently used values if needed
+        
+        Args:
+            key: Cache key
+            value: Bytes to cache
+            timestamp: Time the value was created (defaults to now)
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.time() if timestamp is None else timestamp, value)
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _remove(self, key):
+        """Remove an entry (lock must be held)"""
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= len(entry[1])
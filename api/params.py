@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Request parameters for the article endpoint
+Parses scraper and browser settings from query parameters into an immutable object
+"""
+from dataclasses import dataclass, replace
+
+from helpers import parse_bool_param, parse_int_param, parse_list_param
+
+
+def parse_str_param(value, default):
+    """Parse string parameter (used as given, even when empty)"""
+    if value is None:
+        return default
+    return value
+
+
+def parse_optional_int_param(value, _default):
+    """
+    Parse integer parameter that is unset when empty or invalid
+    
+    The default only applies when the parameter is missing, so it is accepted
+    for the common parser signature but not used.
+    """
+    return parse_int_param(value, None)
+
+
+@dataclass(frozen=True, slots=True)
+class ArticleParams:
+    """Scraper and browser settings of an article request"""
+    
+    # Scraper settings
+    cache: bool
+    full_content: bool
+    screenshot: bool
+    user_scripts: str
+    user_scripts_timeout: int
+    browser: bool
+    text: bool
+    
+    # Browser settings
+    incognito: bool
+    timeout: int
+    wait_until: str
+    sleep: int
+    resource: str
+    viewport_width: int
+    viewport_height: int
+    screen_width: int
+    screen_height: int
+    device: str
+    scroll_down: int
+    ignore_https_errors: bool
+    user_agent: str
+    locale: str
+    timezone: str
+    http_credentials: str
+    extra_http_headers: str
+    
+    @classmethod
+    def from_args(cls, args, defaults):
+        """
+        Parse request parameters
+        
+        Args:
+            args: Mapping of query parameter names to values
+            defaults: ArticleParams used for parameters that are not set
+        """
+        # Single pass over the given parameters instead of a lookup per field
+        values = {}
+        for name, value in args.items():
+            param = PARAMS.get(name)
+            if param:
+                field, parse = param
+                values[field] = parse(value, getattr(defaults, field))
+        return replace(defaults, **values) if values else defaults
+    
+    def cache_query(self):
+        """Parameters identifying the content, used to build the cache key"""
+        # 'cache' is excluded because it doesn't affect content
+        query = {
+            'full-content': self.full_content,
+            'screenshot': self.screenshot,
+            'user-scripts': self.user_scripts,
+            'user-scripts-timeout': self.user_scripts_timeout,
+            'incognito': self.incognito,
+            'timeout': self.timeout,
+            'wait-until': self.wait_until,
+            'sleep': self.sleep,
+            'resource': self.resource,
+            'viewport-width': self.viewport_width,
+            'viewport-height': self.viewport_height,
+            'screen-width': self.screen_width,
+            'screen-height': self.screen_height,
+            'device': self.device,
+            'scroll-down': self.scroll_down,
+            'ignore-https-errors': self.ignore_https_errors,
+            'user-agent': self.user_agent,
+            'locale': self.locale,
+            'timezone': self.timezone,
+        }
+        # Pages fetched without a browser may differ, so they are cached
+        # separately (without changing the keys of browser results)
+        if not self.browser:
+            query['browser'] = False
+        # Same for results without text content
+        if not self.text:
+            query['text'] = False
+        return query
+
+
+# Query parameter name -> (ArticleParams field, parser)
+PARAMS = {
+    'cache': ('cache', parse_bool_param),
+    'full-content': ('full_content', parse_bool_param),
+    'screenshot': ('screenshot', parse_bool_param),
+    'user-scripts': ('user_scripts', parse_list_param),
+    'user-scripts-timeout': ('user_scripts_timeout', parse_int_param),
+    'browser': ('browser', parse_bool_param),
+    'text': ('text', parse_bool_param),
+    'incognito': ('incognito', parse_bool_param),
+    'timeout': ('timeout', parse_int_param),
+    'wait-until': ('wait_until', parse_str_param),
+    'sleep': ('sleep', parse_int_param),
+    'resource': ('resource', parse_list_param),
+    'viewport-width': ('viewport_width', parse_optional_int_param),
+    'viewport-height': ('viewport_height', parse_optional_int_param),
+    'screen-width': ('screen_width', parse_optional_int_param),
+    'screen-height': ('screen_height', parse_optional_int_param),
+    'device': ('device', parse_str_param),
+    'scroll-down': ('scroll_down', parse_int_param),
+    'ignore-https-errors': ('ignore_https_errors', parse_bool_param),
+    'user-agent': ('user_agent', parse_str_param),
+    'locale': ('locale', parse_str_param),
+    'timezone': ('timezone', parse_str_param),
+    'http-credentials': ('http_credentials', parse_str_param),
+    'extra-http-headers': ('extra_http_headers', parse_str_param),
+}
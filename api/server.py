@@ -4,6 +4,7 @@ SeleniumBase API Server
 Provides HTTP endpoints for web scraping using SeleniumBase
 """
 from flask import Flask
+from json_provider import ORJSONProvider
 import logging
 import os
 from pathlib import Path
@@ -14,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Cache and user scripts directories
 CACHE_DIR = Path("/SeleniumBase/api/cache")
@@ -31,6 +33,8 @@ DEFAULT_FULL_CONTENT = os.getenv('DEFAULT_FULL_CONTENT', 'false').lower() == 'tr
 DEFAULT_SCREENSHOT = os.getenv('DEFAULT_SCREENSHOT', 'false').lower() == 'true'
 DEFAULT_USER_SCRIPTS = os.getenv('DEFAULT_USER_SCRIPTS', '')
 DEFAULT_USER_SCRIPTS_TIMEOUT = int(os.getenv('DEFAULT_USER_SCRIPTS_TIMEOUT', '0'))
+DEFAULT_BROWSER = os.getenv('DEFAULT_BROWSER', 'true').lower() == 'true'
+DEFAULT_TEXT = os.getenv('DEFAULT_TEXT', 'true').lower() == 'true'
 
 # Environment variable defaults for browser settings
 DEFAULT_INCOGNITO = os.getenv('DEFAULT_INCOGNITO', 'true').lower() == 'true'
@@ -54,16 +58,33 @@ DEFAULT_EXTRA_HTTP_HEADERS = os.getenv('DEFAULT_EXTRA_HTTP_HEADERS', '')
 # Cache TTL in seconds (default: 60 minutes)
 DEFAULT_CACHE_TTL = int(os.getenv('DEFAULT_CACHE_TTL', '3600'))
 
+# Size of the in-memory cache of recently used results, per worker (0 disables it)
+MEMORY_CACHE_SIZE_MB = int(os.getenv('MEMORY_CACHE_SIZE_MB', '64'))
+
+# Embed screenshots in results as data URIs instead of saving them to SCREENSHOTS_DIR
+SCREENSHOT_INLINE = os.getenv('SCREENSHOT_INLINE', 'false').lower() == 'true'
+
+# Browser driver pool (0 disables pooling: a new browser is started for each request)
+DRIVER_POOL_SIZE = int(os.getenv('DRIVER_POOL_SIZE', '0'))
+DRIVER_MAX_USES = int(os.getenv('DRIVER_MAX_USES', '50'))
+
+# Maximum number of URLs a batch request fetches in parallel
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '5'))
+
+# Number of processes parsing fetched HTML (0 parses on the request thread)
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '0'))
+
 # Server configuration
 API_HOST = os.getenv('API_HOST', '0.0.0.0')
 API_PORT = int(os.getenv('API_PORT', '3000'))
 
 # Import endpoint modules
-from endpoints import health, root, article
+from endpoints import health, root, article, screenshot
 
 # Register all routes
 health.register_routes(app)
 root.register_routes(app)
+screenshot.register_routes(app, SCREENSHOTS_DIR)
 article.register_routes(
     app, 
     CACHE_DIR, 
@@ -91,11 +112,20 @@ article.register_routes(
     DEFAULT_TIMEZONE,
     DEFAULT_HTTP_CREDENTIALS,
     DEFAULT_EXTRA_HTTP_HEADERS,
-    DEFAULT_CACHE_TTL
+    DEFAULT_CACHE_TTL,
+    driver_pool_size=DRIVER_POOL_SIZE,
+    driver_max_uses=DRIVER_MAX_USES,
+    batch_max_concurrency=BATCH_MAX_CONCURRENCY,
+    parse_workers=PARSE_WORKERS,
+    default_browser=DEFAULT_BROWSER,
+    memory_cache_size_mb=MEMORY_CACHE_SIZE_MB,
+    screenshot_inline=SCREENSHOT_INLINE,
+    default_text=DEFAULT_TEXT
 )
 
 
 if __name__ == '__main__':
-    # Run Flask app with configurable host and port
+    # Run Flask development server with configurable host and port
+    # (the Docker image serves the app with gunicorn, see gunicorn.conf.py)
     logger.info(f"Starting server on {API_HOST}:{API_PORT}")
     app.run(host=API_HOST, port=API_PORT, debug=False)
@@ -0,0 +1,147 @@
+"""
+Shared pytest fixtures for the SeleniumBase API tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from flask import Flask
+
+# Add parent directory to path to import the API modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from endpoints import article, health, root, screenshot
+from json_provider import ORJSONProvider
+
+# Page source of the mock driver unless a test sets its own
+SAMPLE_HTML = '<html><body>Test</body></html>'
+
+
+# Memory-backed filesystem for the files the test apps write, when available
+SHM_DIR = Path('/dev/shm')
+
+
+@pytest.fixture(scope='session')
+def session_dirs(tmp_path_factory):
+    """Cache, screenshots and user scripts directories shared by the session's test apps"""
+    if SHM_DIR.is_dir() and os.access(SHM_DIR, os.W_OK):
+        base = Path(tempfile.mkdtemp(prefix='seleniumbase-api-tests-', dir=SHM_DIR))
+    else:
+        base = tmp_path_factory.mktemp('server')
+    dirs = SimpleNamespace(
+        cache=base / 'cache',
+        screenshots=base / 'screenshots',
+        user_scripts=base / 'user_scripts',
+    )
+    for path in vars(dirs).values():
+        path.mkdir()
+    
+    yield dirs
+    if base.parent == SHM_DIR:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+@pytest.fixture
+def server_dirs(session_dirs):
+    """The shared directories, emptied after each test so no files leak into the next one"""
+    yield session_dirs
+    # Best effort, a file the test already removed is not a failure of the test
+    for path in vars(session_dirs).values():
+        for child in path.iterdir():
+            if child.is_dir():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                child.unlink(missing_ok=True)
+
+
+@pytest.fixture(scope='session')
+def make_app(session_dirs):
+    """Factory building a test app using the shared directories, options are passed to the article routes"""
+    def make(**options):
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.json = ORJSONProvider(app)
+        
+        health.register_routes(app)
+        root.register_routes(app)
+        screenshot.register_routes(app, session_dirs.screenshots)
+        article.register_routes(
+            app, session_dirs.cache, session_dirs.user_scripts, session_dirs.screenshots,
+            server.DEFAULT_CACHE, server.DEFAULT_FULL_CONTENT, server.DEFAULT_SCREENSHOT,
+            server.DEFAULT_USER_SCRIPTS, server.DEFAULT_USER_SCRIPTS_TIMEOUT, server.DEFAULT_INCOGNITO,
+            server.DEFAULT_TIMEOUT, server.DEFAULT_WAIT_UNTIL, server.DEFAULT_SLEEP, server.DEFAULT_RESOURCE,
+            server.DEFAULT_VIEWPORT_WIDTH, server.DEFAULT_VIEWPORT_HEIGHT, server.DEFAULT_SCREEN_WIDTH,
+            server.DEFAULT_SCREEN_HEIGHT, server.DEFAULT_DEVICE, server.DEFAULT_SCROLL_DOWN,
+            server.DEFAULT_IGNORE_HTTPS_ERRORS, server.DEFAULT_USER_AGENT, server.DEFAULT_LOCALE,
+            server.DEFAULT_TIMEZONE, server.DEFAULT_HTTP_CREDENTIALS, server.DEFAULT_EXTRA_HTTP_HEADERS,
+            server.DEFAULT_CACHE_TTL, **options
+        )
+        return app
+    
+    return make
+
+
+@pytest.fixture(scope='session')
+def app(make_app):
+    """Test app with the default options, built once per session"""
+    return make_app()
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    """Test client for the app, shared by the whole session"""
+    return app.test_client()
+
+
+class FakeDriver:
+    """Stand-in for a browser driver, with mocks for the methods the API calls"""
+    
+    def __init__(self):
+        self.current_url = 'https://example.com'
+        self.page_source = SAMPLE_HTML
+        self.get = Mock()
+        self.quit = Mock()
+        self.execute_script = Mock()
+        self.execute_cdp_cmd = Mock()
+        self.set_window_size = Mock()
+        self.set_page_load_timeout = Mock()
+        self.save_screenshot = Mock(return_value=True)
+        self.get_screenshot_as_base64 = Mock(return_value='')
+
+
+@pytest.fixture(scope='session')
+def patched_driver_class():
+    """Replace the browser driver class with a mock once for the whole session"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        driver_class = Mock()
+        monkeypatch.setattr(article, 'Driver', driver_class)
+        yield driver_class
+
+
+@pytest.fixture
+def mock_driver_class(patched_driver_class):
+    """The mocked browser driver class, reset for each test to return a new mock_driver"""
+    patched_driver_class.reset_mock(return_value=True, side_effect=True)
+    patched_driver_class.return_value = FakeDriver()
+    return patched_driver_class
+
+
+@pytest.fixture
+def mock_driver(mock_driver_class):
+    """The mock browser driver, tests override page_source or current_url as needed"""
+    return mock_driver_class.return_value
+
+
+@pytest.fixture
+def mock_sleep(monkeypatch):
+    """Make time.sleep return immediately, the mock records the requested delays"""
+    sleep = MagicMock()
+    monkeypatch.setattr(time, 'sleep', sleep)
+    return sleep
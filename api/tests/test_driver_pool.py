@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the driver pool in driver_pool.py
+"""
+import unittest
+from unittest.mock import MagicMock
+
+from driver_pool import DriverPool
+
+
+class TestDriverPool(unittest.TestCase):
+    """Test driver acquisition, reuse and recycling"""
+    
+    def setUp(self):
+        """Create a driver factory returning a new mock driver per call"""
+        self.factory = MagicMock(side_effect=lambda **kwargs: MagicMock())
+        self.driver_kwargs = {'browser': 'chrome', 'headless': True}
+    
+    def test_disabled_pool_quits_driver_on_release(self):
+        """Test that drivers are quit when pooling is disabled"""
+        pool = DriverPool(self.factory, max_size=0)
+        
+        driver = pool.acquire(self.driver_kwargs)
+        pool.release(driver)
+        
+        self.factory.assert_called_once_with(**self.driver_kwargs)
+        driver.quit.assert_called_once()
+    
+    def test_enabled_pool_reuses_driver(self):
+        """Test that a released driver is handed out again"""
+        pool = DriverPool(self.factory, max_size=1)
+        
+        driver1 = pool.acquire(self.driver_kwargs)
+        pool.release(driver1)
+        driver2 = pool.acquire(self.driver_kwargs)
+        
+        self.assertIs(driver1, driver2)
+        self.factory.assert_called_once()
+        driver1.quit.assert_not_called()
+        driver1.execute_cdp_cmd.assert_called_once_with('Network.clearBrowserCookies', {})
+        driver1.get.assert_called_once_with('about:blank')
+    
+    def test_pool_does_not_mix_driver_options(self):
+        """Test that drivers are only reused for the same options and session settings"""
+        pool = DriverPool(self.factory, max_size=1)
+        
+        driver1 = pool.acquire(self.driver_kwargs, session_key=(1024, 768))
+        pool.release(driver1)
+        
+        driver2 = pool.acquire(self.driver_kwargs, session_key=(800, 600))
+        driver3 = pool.acquire({'browser': 'chrome', 'headless': False}, session_key=(1024, 768))
+        
+        self.assertIsNot(driver1, driver2)
+        self.assertIsNot(driver1, driver3)
+        self.assertEqual(self.factory.call_count, 3)
+    
+    def test_unreusable_driver_is_quit(self):
+        """Test that drivers released after an error are not pooled"""
+        pool = DriverPool(self.factory, max_size=1)
+        
+        driver1 = pool.acquire(self.driver_kwargs)
+        pool.release(driver1, reusable=False)
+        driver2 = pool.acquire(self.driver_kwargs)
+        
+        driver1.quit.assert_called_once()
+        self.assertIsNot(driver1, driver2)
+    
+    def test_driver_recycled_after_max_uses(self):
+        """Test that drivers are quit once they served max_uses requests"""
+        pool = DriverPool(self.factory, max_size=1, max_uses=2)
+        
+        driver = pool.acquire(self.driver_kwargs)
+        pool.release(driver)
+        self.assertIs(pool.acquire(self.driver_kwargs), driver)
+        pool.release(driver)
+        
+        driver.quit.assert_called_once()
+        self.assertIsNot(pool.acquire(self.driver_kwargs), driver)
+    
+    def test_driver_failing_reset_is_quit(self):
+        """Test that drivers whose state can't be cleared are not pooled"""
+        pool = DriverPool(self.factory, max_size=1)
+        
+        driver = pool.acquire(self.driver_kwargs)
+        driver.execute_cdp_cmd.side_effect = Exception("session gone")
+        pool.release(driver)
+        
+        driver.quit.assert_called_once()
+        self.assertIsNot(pool.acquire(self.driver_kwargs), driver)
+    
+    def test_pool_reuses_most_recently_released_driver(self):
+        """Test that the last released driver is handed out first"""
+        pool = DriverPool(self.factory, max_size=2)
+        
+        driver1 = pool.acquire(self.driver_kwargs)
+        driver2 = pool.acquire(self.driver_kwargs)
+        pool.release(driver1)
+        pool.release(driver2)
+        
+        self.assertIs(pool.acquire(self.driver_kwargs), driver2)
+    
+    def test_pool_keeps_at_most_max_size_idle_drivers(self):
+        """Test that drivers beyond max_size are quit on release"""
+        pool = DriverPool(self.factory, max_size=1)
+        
+        driver1 = pool.acquire(self.driver_kwargs)
+        driver2 = pool.acquire(self.driver_kwargs)
+        pool.release(driver1)
+        pool.release(driver2)
+        
+        driver1.quit.assert_not_called()
+        driver2.quit.assert_called_once()
+    
+    def test_close_quits_idle_drivers(self):
+        """Test that close() quits all idle drivers"""
+        pool = DriverPool(self.factory, max_size=2)
+        
+        driver = pool.acquire(self.driver_kwargs)
+        pool.release(driver)
+        pool.close()
+        
+        driver.quit.assert_called_once()
@@ -2,565 +2,787 @@
 """
 Integration/Feature tests for API endpoints in server.py
 """
-import unittest
 import json
-import tempfile
-import shutil
+import base64
+import zstandard
+import threading
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
-import sys
-import os
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock, Mock, call
 
-# Add parent directory to path to import server
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
 
-import server
+from endpoints import article
 
+# The app is shared by the session, empty its directories after every test,
+# never start a real browser and never actually sleep
+pytestmark = pytest.mark.usefixtures('server_dirs', 'mock_driver_class', 'mock_sleep')
 
-class TestHealthEndpoint(unittest.TestCase):
+# Fields every /api/article result has
+REQUIRED_FIELDS = frozenset({
+    'id', 'url', 'domain', 'title', 'byline', 'excerpt',
+    'siteName', 'content', 'textContent', 'length', 'lang',
+    'dir', 'publishedTime', 'fullContent', 'date', 'query',
+    'meta', 'resultUri', 'screenshotUri'
+})
+
+SAMPLE_HTML_FULL = '''
+<html lang="en">
+<head>
+    <title>Test Article</title>
+    <meta name="description" content="Test description">
+    <meta name="author" content="Test Author">
+</head>
+<body>
+    <article>
+        <h1>Article Title</h1>
+        <p>Article content here</p>
+    </article>
+</body>
+</html>
+'''
+
+
+@pytest.fixture(scope='module')
+def health_response(client):
+    """The /health response, it never changes so it is requested once"""
+    return client.get('/health')
+
+
+@pytest.fixture(scope='module')
+def root_response(client):
+    """The / response, it never changes so it is requested once"""
+    return client.get('/')
+
+
+class TestHealthEndpoint:
     """Test /health endpoint"""
     
-    def setUp(self):
-        """Set up test client"""
-        server.app.config['TESTING'] = True
-        self.client = server.app.test_client()
-    
-    def test_health_endpoint_returns_200(self):
+    def test_health_endpoint_returns_200(self, health_response):
         """Test that /health endpoint returns 200 status"""
-        response = self.client.get('/health')
-        self.assertEqual(response.status_code, 200)
+        assert health_response.status_code == 200
     
-    def test_health_endpoint_returns_json(self):
+    def test_health_endpoint_returns_json(self, health_response):
         """Test that /health endpoint returns JSON"""
-        response = self.client.get('/health')
-        self.assertEqual(response.content_type, 'application/json')
+        assert health_response.content_type == 'application/json'
     
-    def test_health_endpoint_contains_status(self):
+    def test_health_endpoint_contains_status(self, health_response):
         """Test that /health endpoint contains status field"""
-        response = self.client.get('/health')
-        data = json.loads(response.data)
-        
-        self.assertIn('status', data)
-        self.assertEqual(data['status'], 'healthy')
+        assert health_response.get_json()['status'] == 'healthy'
     
-    def test_health_endpoint_contains_service_name(self):
+    def test_health_endpoint_contains_service_name(self, health_response):
         """Test that /health endpoint contains service field"""
-        response = self.client.get('/health')
-        data = json.loads(response.data)
-        
-        self.assertIn('service', data)
-        self.assertEqual(data['service'], 'seleniumbase-api')
+        assert health_response.get_json()['service'] == 'seleniumbase-api'
 
 
-class TestRootEndpoint(unittest.TestCase):
+class TestRootEndpoint:
     """Test / (root) endpoint"""
     
-    def setUp(self):
-        """Set up test client"""
-        server.app.config['TESTING'] = True
-        self.client = server.app.test_client()
-    
-    def test_root_endpoint_returns_200(self):
+    def test_root_endpoint_returns_200(self, root_response):
         """Test that / endpoint returns 200 status"""
-        response = self.client.get('/')
-        self.assertEqual(response.status_code, 200)
+        assert root_response.status_code == 200
     
-    def test_root_endpoint_returns_json(self):
+    def test_root_endpoint_returns_json(self, root_response):
         """Test that / endpoint returns JSON"""
-        response = self.client.get('/')
-        self.assertEqual(response.content_type, 'application/json')
+        assert root_response.content_type == 'application/json'
     
-    def test_root_endpoint_contains_service_info(self):
+    def test_root_endpoint_contains_service_info(self, root_response):
         """Test that / endpoint contains service information"""
-        response = self.client.get('/')
-        data = json.loads(response.data)
+        data = root_response.get_json()
         
-        self.assertIn('service', data)
-        self.assertIn('version', data)
-        self.assertEqual(data['service'], 'SeleniumBase API')
+        assert 'version' in data
+        assert data['service'] == 'SeleniumBase API'
     
-    def test_root_endpoint_contains_endpoints_documentation(self):
+    @pytest.mark.parametrize('path', ['/api/article', '/api/article/batch', '/health'])
+    def test_root_endpoint_contains_endpoints_documentation(self, root_response, path):
         """Test that / endpoint contains endpoints documentation"""
-        response = self.client.get('/')
-        data = json.loads(response.data)
-        
-        self.assertIn('endpoints', data)
-        self.assertIn('/api/article', data['endpoints'])
-        self.assertIn('/health', data['endpoints'])
+        assert path in root_response.get_json()['endpoints']
     
-    def test_root_endpoint_article_docs_complete(self):
+    @pytest.mark.parametrize('field', ['method', 'description', 'parameters', 'example'])
+    def test_root_endpoint_article_docs_complete(self, root_response, field):
         """Test that /api/article documentation is complete"""
-        response = self.client.get('/')
-        data = json.loads(response.data)
-        
-        article_docs = data['endpoints']['/api/article']
-        self.assertIn('method', article_docs)
-        self.assertIn('description', article_docs)
-        self.assertIn('parameters', article_docs)
-        self.assertIn('example', article_docs)
+        assert field in root_response.get_json()['endpoints']['/api/article']
 
 
-class TestArticleEndpointBasics(unittest.TestCase):
+class TestArticleEndpointBasics:
     """Test basic functionality of /api/article endpoint"""
     
-    def setUp(self):
-        """Set up test client and temp directories"""
-        server.app.config['TESTING'] = True
-        self.client = server.app.test_client()
-        
-        # Create temporary directories
-        self.temp_cache_dir = tempfile.mkdtemp()
-        self.temp_screenshots_dir = tempfile.mkdtemp()
-        self.temp_user_scripts_dir = tempfile.mkdtemp()
-        
-        # Store original directories
-        self.original_cache_dir = server.CACHE_DIR
-        self.original_screenshots_dir = server.SCREENSHOTS_DIR
-        self.original_user_scripts_dir = server.USER_SCRIPTS_DIR
-        
-        # Replace with temp directories
-        server.CACHE_DIR = Path(self.temp_cache_dir)
-        server.SCREENSHOTS_DIR = Path(self.temp_screenshots_dir)
-        server.USER_SCRIPTS_DIR = Path(self.temp_user_scripts_dir)
-    
-    def tearDown(self):
-        """Clean up temp directories"""
-        shutil.rmtree(self.temp_cache_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_screenshots_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_user_scripts_dir, ignore_errors=True)
-    
-    def test_article_endpoint_requires_url(self):
+    def test_article_endpoint_requires_url(self, client):
         """Test that /api/article returns error without URL parameter"""
-        response = self.client.get('/api/article')
+        response = client.get('/api/article')
         
-        self.assertEqual(response.status_code, 400)
-        data = json.loads(response.data)
-        self.assertIn('detail', data)
-        self.assertEqual(data['detail'][0]['type'], 'missing_parameter')
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'detail' in data
+        assert data['detail'][0]['type'] == 'missing_parameter'
     
-    def test_article_endpoint_error_format(self):
+    def test_article_endpoint_error_format(self, client):
         """Test that error responses follow the correct format"""
-        response = self.client.get('/api/article')
+        response = client.get('/api/article')
         
-        data = json.loads(response.data)
-        self.assertIn('detail', data)
-        self.assertIsInstance(data['detail'], list)
-        self.assertIn('type', data['detail'][0])
-        self.assertIn('msg', data['detail'][0])
+        data = response.get_json()
+        assert 'detail' in data
+        assert isinstance(data['detail'], list)
+        assert 'type' in data['detail'][0]
+        assert 'msg' in data['detail'][0]
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_with_url(self, mock_driver_class):
+    def test_article_endpoint_with_url(self, mock_driver, client):
         """Test that /api/article works with URL parameter"""
-        # Mock the Driver
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
         mock_driver.page_source = '<html><head><title>Test</title></head><body><p>Content</p></body></html>'
         
-        response = self.client.get('/api/article?url=https://example.com')
+        response = client.get('/api/article?url=https://example.com')
         
-        self.assertEqual(response.status_code, 200)
-        data = json.loads(response.data)
+        assert response.status_code == 200
+        data = response.get_json()
         
         # Verify response structure
-        self.assertIn('id', data)
-        self.assertIn('url', data)
-        self.assertIn('title', data)
-        self.assertIn('content', data)
+        assert 'id' in data
+        assert 'url' in data
+        assert 'title' in data
+        assert 'content' in data
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_returns_all_required_fields(self, mock_driver_class):
+    def test_article_endpoint_returns_all_required_fields(self, mock_driver, client):
         """Test that /api/article returns all required fields"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
+        mock_driver.current_url = 'https://example.com/article'
+        mock_driver.page_source = SAMPLE_HTML_FULL
+        
+        response = client.get('/api/article?url=https://example.com/article')
+        data = response.get_json()
+        
+        missing = REQUIRED_FIELDS - data.keys()
+        assert not missing, f"Missing required fields: {sorted(missing)}"
+    
+    def test_article_endpoint_extracts_metadata(self, mock_driver, client):
+        """Test that /api/article extracts metadata from meta tags"""
         mock_driver.current_url = 'https://example.com/article'
         mock_driver.page_source = '''
-        <html lang="en">
+        <html lang="en" dir="ltr">
         <head>
-            <title>Test Article</title>
-            <meta name="description" content="Test description">
-            <meta name="author" content="Test Author">
+            <meta property="og:title" content="OG Title">
+            <meta property="og:description" content="OG description">
+            <meta property="og:site_name" content="Example Site">
+            <meta property="article:author" content="Article Author">
+            <meta property="article:published_time" content="2023-01-15T10:30:00Z">
         </head>
-        <body>
-            <article>
-                <h1>Article Title</h1>
-                <p>Article content here</p>
-            </article>
-        </body>
+        <body><p>Content</p></body>
         </html>
         '''
         
-        response = self.client.get('/api/article?url=https://example.com/article')
-        data = json.loads(response.data)
+        response = client.get('/api/article?url=https://example.com/article')
+        data = response.get_json()
         
-        # Check all required fields
-        required_fields = [
-            'id', 'url', 'domain', 'title', 'byline', 'excerpt',
-            'siteName', 'content', 'textContent', 'length', 'lang',
-            'dir', 'publishedTime', 'fullContent', 'date', 'query',
-            'meta', 'resultUri', 'screenshotUri'
-        ]
-        
-        for field in required_fields:
-            self.assertIn(field, data, f"Missing required field: {field}")
+        assert data['title'] == 'OG Title'
+        assert data['excerpt'] == 'OG description'
+        assert data['siteName'] == 'Example Site'
+        assert data['byline'] == 'Article Author'
+        assert data['publishedTime'] == '2023-01-15T10:30:00Z'
+        assert data['lang'] == 'en'
+        assert data['dir'] == 'ltr'
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_driver_called_correctly(self, mock_driver_class):
+    def test_article_endpoint_driver_called_correctly(self, mock_driver_class, client):
         """Test that Driver is instantiated with correct parameters"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        self.client.get('/api/article?url=https://example.com')
+        client.get('/api/article?url=https://example.com')
         
         # Verify Driver was called
         mock_driver_class.assert_called_once()
         call_kwargs = mock_driver_class.call_args[1]
         
-        self.assertEqual(call_kwargs['browser'], 'chrome')
-        self.assertTrue(call_kwargs['headless'])
-        self.assertTrue(call_kwargs['uc'])
+        assert call_kwargs['browser'] == 'chrome'
+        assert call_kwargs['headless']
+        assert call_kwargs['uc']
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_driver_quit_called(self, mock_driver_class):
+    def test_article_endpoint_driver_quit_called(self, mock_driver, client):
         """Test that Driver.quit() is always called"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        self.client.get('/api/article?url=https://example.com')
+        client.get('/api/article?url=https://example.com')
         
         # Verify quit was called
         mock_driver.quit.assert_called_once()
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_handles_driver_exception(self, mock_driver_class):
+    def test_article_endpoint_handles_driver_exception(self, mock_driver, client):
         """Test that endpoint handles exceptions from Driver"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
         mock_driver.get.side_effect = Exception("Connection error")
         
-        response = self.client.get('/api/article?url=https://example.com')
+        response = client.get('/api/article?url=https://example.com')
         
-        self.assertEqual(response.status_code, 500)
-        data = json.loads(response.data)
-        self.assertIn('detail', data)
-        self.assertEqual(data['detail'][0]['type'], 'fetch_error')
+        assert response.status_code == 500
+        data = response.get_json()
+        assert 'detail' in data
+        assert data['detail'][0]['type'] == 'fetch_error'
 
 
-class TestArticleEndpointParameters(unittest.TestCase):
+class TestArticleEndpointParameters:
     """Test parameter handling in /api/article endpoint"""
     
-    def setUp(self):
-        """Set up test client and temp directories"""
-        from endpoints import article, health, root
-        from flask import Flask
-        
-        self.app = Flask(__name__)
-        self.app.config['TESTING'] = True
-        self.client = self.app.test_client()
-        
-        self.temp_cache_dir = tempfile.mkdtemp()
-        self.temp_screenshots_dir = tempfile.mkdtemp()
-        self.temp_user_scripts_dir = tempfile.mkdtemp()
-        
-        health.register_routes(self.app)
-        root.register_routes(self.app)
-        article.register_routes(
-            self.app, Path(self.temp_cache_dir), Path(self.temp_user_scripts_dir), Path(self.temp_screenshots_dir),
-            server.DEFAULT_CACHE, server.DEFAULT_FULL_CONTENT, server.DEFAULT_SCREENSHOT,
-            server.DEFAULT_USER_SCRIPTS, server.DEFAULT_USER_SCRIPTS_TIMEOUT, server.DEFAULT_INCOGNITO,
-            server.DEFAULT_TIMEOUT, server.DEFAULT_WAIT_UNTIL, server.DEFAULT_SLEEP, server.DEFAULT_RESOURCE,
-            server.DEFAULT_VIEWPORT_WIDTH, server.DEFAULT_VIEWPORT_HEIGHT, server.DEFAULT_SCREEN_WIDTH,
-            server.DEFAULT_SCREEN_HEIGHT, server.DEFAULT_DEVICE, server.DEFAULT_SCROLL_DOWN,
-            server.DEFAULT_IGNORE_HTTPS_ERRORS, server.DEFAULT_USER_AGENT, server.DEFAULT_LOCALE,
-            server.DEFAULT_TIMEZONE, server.DEFAULT_HTTP_CREDENTIALS, server.DEFAULT_EXTRA_HTTP_HEADERS,
-            server.DEFAULT_CACHE_TTL
-        )
-    
-    def tearDown(self):
-        """Clean up temp directories"""
-        shutil.rmtree(self.temp_cache_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_screenshots_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_user_scripts_dir, ignore_errors=True)
-    
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_full_content_parameter(self, mock_driver_class):
+    def test_article_endpoint_full_content_parameter(self, mock_driver, client):
         """Test full-content parameter includes full HTML"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
         mock_driver.page_source = '<html><body>Full HTML content</body></html>'
         
         # Without full-content
-        response = self.client.get('/api/article?url=https://example.com')
-        data = json.loads(response.data)
-        self.assertIsNone(data['fullContent'])
+        response = client.get('/api/article?url=https://example.com')
+        data = response.get_json()
+        assert data['fullContent'] is None
         
         # With full-content
-        response = self.client.get('/api/article?url=https://example.com&full-content=true')
-        data = json.loads(response.data)
-        self.assertIsNotNone(data['fullContent'])
-        self.assertIn('Full HTML content', data['fullContent'])
-    
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_viewport_parameters(self, mock_driver_class):
-        """Test viewport-width and viewport-height parameters"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        response = self.client.get('/api/article?url=https://example.com&viewport-width=1024&viewport-height=768')
-        
-        self.assertEqual(response.status_code, 200)
-        mock_driver.set_window_size.assert_called_once_with(1024, 768)
-    
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_timeout_parameter(self, mock_driver_class):
-        """Test timeout parameter"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        response = self.client.get('/api/article?url=https://example.com&timeout=30000')
-        
-        self.assertEqual(response.status_code, 200)
-        mock_driver.set_page_load_timeout.assert_called_once_with(30.0)
-    
-    @patch('endpoints.article.Driver')
-    @patch('time.sleep')
-    def test_article_endpoint_sleep_parameter(self, mock_sleep, mock_driver_class):
-        """Test sleep parameter"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
+        response = client.get('/api/article?url=https://example.com&full-content=true')
+        data = response.get_json()
+        assert data['fullContent'] is not None
+        assert 'Full HTML content' in data['fullContent']
+    
+    @pytest.mark.parametrize('query, method, expected', [
+        ('viewport-width=1024&viewport-height=768', 'set_window_size', call(1024, 768)),
+        ('timeout=30000', 'set_page_load_timeout', call(30.0)),
+        ('scroll-down=500', 'execute_script', call('window.scrollBy(0, 500);')),
+    ], ids=['viewport', 'timeout', 'scroll-down'])
+    def test_article_endpoint_driver_parameters(self, mock_driver, client, query, method, expected):
+        """Test that viewport-width/height, timeout and scroll-down are applied to the driver"""
+        response = client.get(f'/api/article?url=https://example.com&{query}')
+        
+        assert response.status_code == 200
+        assert getattr(mock_driver, method).call_args_list.count(expected) == 1
+    
+    def test_article_endpoint_resource_parameter(self, mock_driver_class, mock_driver, client):
+        """Test resource parameter blocks other resource types before navigating"""
+        response = client.get('/api/article?url=https://example.com&resource=document,script')
+        
+        assert response.status_code == 200
+        cdp_calls = {call[0][0]: call[0][1] for call in mock_driver.execute_cdp_cmd.call_args_list}
+        assert 'Network.enable' in cdp_calls
+        blocked_urls = cdp_calls['Network.setBlockedURLs']['urls']
+        assert '*.png' in blocked_urls
+        assert '*.js' not in blocked_urls
+        assert mock_driver_class.call_args[1]['block_images']
+    
+    def test_article_endpoint_allows_all_resources_by_default(self, mock_driver_class, mock_driver, client):
+        """Test that no resources are blocked without the resource parameter"""
+        response = client.get('/api/article?url=https://example.com')
+        
+        assert response.status_code == 200
+        mock_driver.execute_cdp_cmd.assert_not_called()
+        assert 'block_images' not in mock_driver_class.call_args[1]
+    
+    @patch('requests.Session.get')
+    def test_article_endpoint_browser_false_uses_http(self, mock_get, mock_driver_class, client):
+        """Test that browser=false serves server-rendered pages without a browser"""
+        mock_get.return_value = MagicMock(
+            status_code=200,
+            headers={'Content-Type': 'text/html; charset=utf-8'},
+            url='https://example.com/final',
+            text='<html><head><title>Static</title></head><body><article>Text</article></body></html>'
+        )
+        
+        response = client.get('/api/article?url=https://example.com&browser=false')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['title'] == 'Static'
+        assert data['url'] == 'https://example.com/final'
+        mock_driver_class.assert_not_called()
+    
+    @patch('requests.Session.get')
+    def test_article_endpoint_browser_false_falls_back_to_browser(self, mock_get, mock_driver_class, mock_driver, client):
+        """Test that pages without article markup are loaded in the browser"""
+        mock_get.return_value = MagicMock(
+            status_code=200,
+            headers={'Content-Type': 'text/html'},
+            url='https://example.com',
+            text='<html><body><div id="root"></div><script src="app.js"></script></body></html>'
+        )
+        mock_driver.page_source = '<html><head><title>Rendered</title></head><body>Test</body></html>'
+        
+        response = client.get('/api/article?url=https://example.com&browser=false')
+        
+        assert response.status_code == 200
+        assert response.get_json()['title'] == 'Rendered'
+        mock_driver_class.assert_called_once()
+    
+    @pytest.mark.parametrize('query', ['screenshot=true', 'scroll-down=500', 'sleep=1000'])
+    @patch('requests.Session.get')
+    def test_article_endpoint_browser_false_with_browser_options_uses_browser(self, mock_get, mock_driver_class, client, query):
+        """Test that screenshots, scrolling and waiting always use the browser"""
+        response = client.get(f'/api/article?url=https://example.com&browser=false&{query}')
         
-        response = self.client.get('/api/article?url=https://example.com&sleep=2000')
+        assert response.status_code == 200
+        mock_get.assert_not_called()
+        mock_driver_class.assert_called_once()
+    
+    def test_article_endpoint_sleep_parameter(self, mock_sleep, client):
+        """Test sleep parameter"""
+        response = client.get('/api/article?url=https://example.com&sleep=2000')
         
-        self.assertEqual(response.status_code, 200)
+        assert response.status_code == 200
         # Check that sleep was called with 2.0 seconds
-        mock_sleep.assert_called()
-        sleep_calls = [call[0][0] for call in mock_sleep.call_args_list]
-        self.assertIn(2.0, sleep_calls)
-    
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_scroll_down_parameter(self, mock_driver_class):
-        """Test scroll-down parameter"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        response = self.client.get('/api/article?url=https://example.com&scroll-down=500')
-        
-        self.assertEqual(response.status_code, 200)
-        # Check that execute_script was called with scroll command
-        mock_driver.execute_script.assert_called()
-        script_calls = [str(call) for call in mock_driver.execute_script.call_args_list]
-        self.assertTrue(any('scrollBy' in str(call) for call in script_calls))
-    
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_user_scripts_parameter(self, mock_driver_class):
+        mock_sleep.assert_any_call(2.0)
+    
+    def test_article_endpoint_user_scripts_parameter(self, mock_driver, client, server_dirs, monkeypatch):
         """Test user-scripts parameter"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        # Create a test user script
-        script_path = Path(self.temp_user_scripts_dir) / 'test-script.js'
-        with open(script_path, 'w') as f:
-            f.write('console.log("test");')
+        read_script = Mock(return_value='console.log("test");')
+        monkeypatch.setattr(article, 'read_user_script', read_script)
         
-        response = self.client.get('/api/article?url=https://example.com&user-scripts=test-script.js')
+        response = client.get('/api/article?url=https://example.com&user-scripts=test-script.js')
         
-        self.assertEqual(response.status_code, 200)
+        assert response.status_code == 200
+        assert read_script.call_args[0][0] == server_dirs.user_scripts / 'test-script.js'
         # Verify execute_script was called with user script
-        mock_driver.execute_script.assert_called()
-    
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_incognito_parameter(self, mock_driver_class):
+        mock_driver.execute_script.assert_any_call('console.log("test");')
+    
+    def test_article_endpoint_text_parameter(self, mock_driver, client):
+        """Test that text=false skips the text content but keeps the other fields"""
+        mock_driver.page_source = '<html><head><title>Title</title></head><body><p>Text</p></body></html>'
+        
+        response = client.get('/api/article?url=https://example.com&text=false')
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['title'] == 'Title'
+        assert data['textContent'] is None
+        assert data['length'] is None
+    
+    def test_article_endpoint_user_scripts_read_once_until_changed(self, mock_driver, client, server_dirs):
+        """Test that user scripts are read from disk again only when the file changes"""
+        script_path = server_dirs.user_scripts / 'test-script.js'
+        script_path.write_text('console.log("v1");')
+        url = '/api/article?url=https://example.com&user-scripts=test-script.js'
+        
+        with patch.object(Path, 'read_text', autospec=True, side_effect=Path.read_text) as mock_read:
+            client.get(url)
+            client.get(url)
+            assert mock_read.call_count == 1
+            
+            script_path.write_text('console.log("version 2");')
+            client.get(url)
+            assert mock_read.call_count == 2
+        
+        mock_driver.execute_script.assert_any_call('console.log("v1");')
+        mock_driver.execute_script.assert_called_with('console.log("version 2");')
+    
+    def test_article_endpoint_incognito_parameter(self, mock_driver_class, client):
         """Test incognito parameter"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
-        response = self.client.get('/api/article?url=https://example.com&incognito=false')
+        response = client.get('/api/article?url=https://example.com&incognito=false')
         
-        self.assertEqual(response.status_code, 200)
+        assert response.status_code == 200
         # Check that Driver was called with incognito=False
         call_kwargs = mock_driver_class.call_args[1]
-        self.assertFalse(call_kwargs['incognito'])
+        assert not call_kwargs['incognito']
 
 
-class TestArticleEndpointCaching(unittest.TestCase):
-    """Test caching functionality in /api/article endpoint"""
+class TestWaitForPageIdle:
+    """Test the bounded wait for pages to finish loading"""
     
-    def setUp(self):
-        """Set up test client and temp directories"""
-        from endpoints import article, health, root
-        from flask import Flask
-        
-        self.app = Flask(__name__)
-        self.app.config['TESTING'] = True
-        self.client = self.app.test_client()
-        
-        self.temp_cache_dir = tempfile.mkdtemp()
-        self.temp_screenshots_dir = tempfile.mkdtemp()
-        self.temp_user_scripts_dir = tempfile.mkdtemp()
-        
-        health.register_routes(self.app)
-        root.register_routes(self.app)
-        article.register_routes(
-            self.app, Path(self.temp_cache_dir), Path(self.temp_user_scripts_dir), Path(self.temp_screenshots_dir),
-            server.DEFAULT_CACHE, server.DEFAULT_FULL_CONTENT, server.DEFAULT_SCREENSHOT,
-            server.DEFAULT_USER_SCRIPTS, server.DEFAULT_USER_SCRIPTS_TIMEOUT, server.DEFAULT_INCOGNITO,
-            server.DEFAULT_TIMEOUT, server.DEFAULT_WAIT_UNTIL, server.DEFAULT_SLEEP, server.DEFAULT_RESOURCE,
-            server.DEFAULT_VIEWPORT_WIDTH, server.DEFAULT_VIEWPORT_HEIGHT, server.DEFAULT_SCREEN_WIDTH,
-            server.DEFAULT_SCREEN_HEIGHT, server.DEFAULT_DEVICE, server.DEFAULT_SCROLL_DOWN,
-            server.DEFAULT_IGNORE_HTTPS_ERRORS, server.DEFAULT_USER_AGENT, server.DEFAULT_LOCALE,
-            server.DEFAULT_TIMEZONE, server.DEFAULT_HTTP_CREDENTIALS, server.DEFAULT_EXTRA_HTTP_HEADERS,
-            server.DEFAULT_CACHE_TTL
-        )
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Fake clock for the article module, sleeping advances it instead of waiting"""
+        clock = SimpleNamespace(now=0.0)
+        
+        def sleep(seconds):
+            clock.now += seconds
+        
+        monkeypatch.setattr(article, 'time', SimpleNamespace(monotonic=lambda: clock.now, sleep=sleep))
+        return clock
     
-    def tearDown(self):
-        """Clean up temp directories"""
-        shutil.rmtree(self.temp_cache_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_screenshots_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_user_scripts_dir, ignore_errors=True)
+    def test_returns_once_page_is_idle(self, clock):
+        """Test that the wait stops as soon as the page reports it is idle"""
+        driver = Mock()
+        driver.execute_script.side_effect = [False, True]
+        
+        article.wait_for_page_idle(driver, max_wait=5)
+        
+        assert clock.now == pytest.approx(2 * article.IDLE_POLL_INTERVAL)
+        assert driver.execute_script.call_count == 2
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_saves_to_cache(self, mock_driver_class):
-        """Test that results are saved to cache"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
+    def test_gives_up_at_max_wait(self, clock):
+        """Test that the wait never lasts longer than max_wait"""
+        driver = Mock()
+        driver.execute_script.return_value = False
+        
+        article.wait_for_page_idle(driver, max_wait=0.3)
         
-        response = self.client.get('/api/article?url=https://example.com')
+        assert clock.now == pytest.approx(0.3)
+    
+    def test_stops_waiting_when_check_fails(self, clock):
+        """Test that a failing idle check ends the wait"""
+        driver = Mock()
+        driver.execute_script.side_effect = Exception("no such window")
+        
+        article.wait_for_page_idle(driver, max_wait=5)
+        
+        driver.execute_script.assert_called_once()
+
+
+class TestArticleEndpointCaching:
+    """Test caching functionality in /api/article endpoint"""
+    
+    def test_article_endpoint_saves_to_cache(self, client, server_dirs):
+        """Test that results are saved to cache"""
+        response = client.get('/api/article?url=https://example.com')
         
-        self.assertEqual(response.status_code, 200)
+        assert response.status_code == 200
         
         # Check that cache file was created
-        cache_files = list(Path(self.temp_cache_dir).glob('*.json'))
-        self.assertGreater(len(cache_files), 0)
+        cache_files = list(server_dirs.cache.glob('*.json.zst'))
+        assert len(cache_files) > 0
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_uses_cache_when_enabled(self, mock_driver_class):
+    def test_article_endpoint_uses_cache_when_enabled(self, mock_driver_class, client):
         """Test that cached results are used when cache=true"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
-        
         # First request - creates cache
-        response1 = self.client.get('/api/article?url=https://example.com')
-        self.assertEqual(response1.status_code, 200)
+        response1 = client.get('/api/article?url=https://example.com')
+        assert response1.status_code == 200
         
         # Reset mock to verify it's not called again
         mock_driver_class.reset_mock()
         
         # Second request with cache=true
-        response2 = self.client.get('/api/article?url=https://example.com&cache=true')
-        self.assertEqual(response2.status_code, 200)
+        response2 = client.get('/api/article?url=https://example.com&cache=true')
+        assert response2.status_code == 200
         
         # Verify Driver was NOT instantiated again (cache was used)
         mock_driver_class.assert_not_called()
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_ignores_cache_by_default(self, mock_driver_class):
-        """Test that cache is not used by default"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
+    def test_article_endpoint_serves_cached_bytes(self, mock_driver, client, server_dirs):
+        """Test that a fresh response is byte-identical to its cache entry"""
+        mock_driver.page_source = '<html><body>Test "quoted" <b>HTML</b></body></html>'
+        
+        response = client.get('/api/article?url=https://example.com&full-content=true')
+        
+        assert response.content_type == 'application/json'
+        cache_files = list(server_dirs.cache.glob('*.json.zst'))
+        assert len(cache_files) == 1
+        assert zstandard.ZstdDecompressor().decompress(cache_files[0].read_bytes()) == response.data
+        assert response.get_json()['fullContent'] == mock_driver.page_source
+    
+    def test_article_endpoint_sends_zstd_to_accepting_clients(self, mock_driver, client, server_dirs):
+        """Test that compressed cache entries are sent as-is to clients accepting zstd"""
+        mock_driver.page_source = '<html><head><title>Compressed</title></head><body>Test</body></html>'
+        headers = {'Accept-Encoding': 'gzip, zstd'}
+        
+        response1 = client.get('/api/article?url=https://example.com', headers=headers)
+        response2 = client.get('/api/article?url=https://example.com&cache=true', headers=headers)
+        
+        cache_file = next(server_dirs.cache.glob('*.json.zst'))
+        for response in (response1, response2):
+            assert response.status_code == 200
+            assert response.headers['Content-Encoding'] == 'zstd'
+            assert 'Accept-Encoding' in response.headers['Vary']
+            assert response.data == cache_file.read_bytes()
+        data = json.loads(zstandard.ZstdDecompressor().decompress(response2.data))
+        assert data['title'] == 'Compressed'
+    
+    def test_article_endpoint_equivalent_urls_share_cache(self, mock_driver_class, mock_driver, client):
+        """Test that equivalent URLs are served from the same cache entry"""
+        mock_driver.current_url = 'https://example.com/'
         
+        client.get('/api/article?url=https://example.com')
+        mock_driver_class.reset_mock()
+        
+        response = client.get('/api/article?url=HTTPS://Example.com:443/%23section&cache=true')
+        
+        assert response.status_code == 200
+        mock_driver_class.assert_not_called()
+    
+    def test_article_endpoint_fetches_concurrent_cache_misses_once(self, mock_driver_class, mock_driver, app):
+        """Test that concurrent cached requests for the same page launch a single browser"""
+        # Keep the first fetch in flight while the other requests arrive,
+        # waiting on an event as time.sleep is mocked
+        mock_driver.get.side_effect = lambda url: threading.Event().wait(0.2)
+        
+        def get_article(_):
+            return app.test_client().get('/api/article?url=https://example.com&cache=true')
+        
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            responses = list(executor.map(get_article, range(3)))
+        
+        assert [response.status_code for response in responses] == [200, 200, 200]
+        assert len({response.data for response in responses}) == 1
+        mock_driver_class.assert_called_once()
+    
+    def test_article_endpoint_cached_response_matches_original(self, mock_driver, client):
+        """Test that a cached response is served with the original content"""
+        mock_driver.page_source = '<html><head><title>Cached</title></head><body>Test</body></html>'
+        
+        response1 = client.get('/api/article?url=https://example.com')
+        response2 = client.get('/api/article?url=https://example.com&cache=true')
+        
+        assert response2.status_code == 200
+        assert response2.content_type == 'application/json'
+        assert response2.get_json() == response1.get_json()
+    
+    def test_article_endpoint_ignores_cache_by_default(self, mock_driver_class, client):
+        """Test that cache is not used by default"""
         # First request - creates cache
-        response1 = self.client.get('/api/article?url=https://example.com')
-        self.assertEqual(response1.status_code, 200)
+        response1 = client.get('/api/article?url=https://example.com')
+        assert response1.status_code == 200
         
         # Reset mock
         mock_driver_class.reset_mock()
         
         # Second request without cache parameter
-        response2 = self.client.get('/api/article?url=https://example.com')
-        self.assertEqual(response2.status_code, 200)
+        response2 = client.get('/api/article?url=https://example.com')
+        assert response2.status_code == 200
         
         # Verify Driver WAS instantiated again (cache was not used)
         mock_driver_class.assert_called()
 
 
-class TestArticleEndpointScreenshot(unittest.TestCase):
-    """Test screenshot functionality in /api/article endpoint"""
+class TestArticleEndpointDriverPool:
+    """Test driver pooling in /api/article endpoint"""
     
-    def setUp(self):
-        """Set up test client and temp directories"""
-        from endpoints import article, health, root
-        from flask import Flask
-        
-        self.app = Flask(__name__)
-        self.app.config['TESTING'] = True
-        self.client = self.app.test_client()
-        
-        self.temp_cache_dir = tempfile.mkdtemp()
-        self.temp_screenshots_dir = tempfile.mkdtemp()
-        self.temp_user_scripts_dir = tempfile.mkdtemp()
-        
-        health.register_routes(self.app)
-        root.register_routes(self.app)
-        article.register_routes(
-            self.app, Path(self.temp_cache_dir), Path(self.temp_user_scripts_dir), Path(self.temp_screenshots_dir),
-            server.DEFAULT_CACHE, server.DEFAULT_FULL_CONTENT, server.DEFAULT_SCREENSHOT,
-            server.DEFAULT_USER_SCRIPTS, server.DEFAULT_USER_SCRIPTS_TIMEOUT, server.DEFAULT_INCOGNITO,
-            server.DEFAULT_TIMEOUT, server.DEFAULT_WAIT_UNTIL, server.DEFAULT_SLEEP, server.DEFAULT_RESOURCE,
-            server.DEFAULT_VIEWPORT_WIDTH, server.DEFAULT_VIEWPORT_HEIGHT, server.DEFAULT_SCREEN_WIDTH,
-            server.DEFAULT_SCREEN_HEIGHT, server.DEFAULT_DEVICE, server.DEFAULT_SCROLL_DOWN,
-            server.DEFAULT_IGNORE_HTTPS_ERRORS, server.DEFAULT_USER_AGENT, server.DEFAULT_LOCALE,
-            server.DEFAULT_TIMEZONE, server.DEFAULT_HTTP_CREDENTIALS, server.DEFAULT_EXTRA_HTTP_HEADERS,
-            server.DEFAULT_CACHE_TTL
-        )
+    @pytest.fixture
+    def client(self, make_app):
+        """Client for an app with its own driver pool, so pooled drivers don't leak between tests"""
+        return make_app(driver_pool_size=1).test_client()
     
-    def tearDown(self):
-        """Clean up temp directories"""
-        shutil.rmtree(self.temp_cache_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_screenshots_dir, ignore_errors=True)
-        shutil.rmtree(self.temp_user_scripts_dir, ignore_errors=True)
+    def test_article_endpoint_reuses_pooled_driver(self, mock_driver_class, mock_driver, client):
+        """Test that consecutive requests reuse the same browser"""
+        response1 = client.get('/api/article?url=https://example.com')
+        response2 = client.get('/api/article?url=https://example.com/other')
+        
+        assert response1.status_code == 200
+        assert response2.status_code == 200
+        mock_driver_class.assert_called_once()
+        mock_driver.quit.assert_not_called()
+        # Each release unloads the page before the driver goes back to the pool
+        mock_driver.get.assert_has_calls([
+            call('https://example.com'),
+            call('about:blank'),
+            call('https://example.com/other'),
+            call('about:blank'),
+        ])
+    
+    def test_article_endpoint_discards_driver_after_error(self, mock_driver, client):
+        """Test that a browser which failed a request is not reused"""
+        mock_driver.get.side_effect = Exception("Connection error")
+        
+        response = client.get('/api/article?url=https://example.com')
+        
+        assert response.status_code == 500
+        mock_driver.quit.assert_called_once()
+
+
+class TestArticleBatchEndpoint:
+    """Test /api/article/batch endpoint"""
+    
+    def _read_lines(self, response):
+        """Parse an NDJSON response, ordered by URL index"""
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+        return sorted(lines, key=lambda line: line['index'])
+    
+    def test_batch_endpoint_missing_urls(self, client):
+        """Test that a missing or empty urls list returns 400"""
+        for payload in (None, {}, {'urls': []}, {'urls': 'https://example.com'}, {'urls': ['']}):
+            response = client.post('/api/article/batch', json=payload)
+            assert response.status_code == 400
+            data = response.get_json()
+            assert data['detail'][0]['type'] == 'missing_parameter'
+    
+    def test_batch_endpoint_streams_one_line_per_url(self, mock_driver_class, mock_driver, client):
+        """Test that each URL gets its own NDJSON result line"""
+        mock_driver.page_source = '<html><head><title>Batch</title></head><body>Test</body></html>'
+        
+        urls = ['https://example.com/a', 'https://example.com/b', 'https://example.com/c']
+        response = client.post('/api/article/batch', json={'urls': urls, 'max_concurrency': 2})
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = self._read_lines(response)
+        assert [line['url'] for line in lines] == urls
+        for line in lines:
+            assert line['status'] == 200
+            assert line['result']['title'] == 'Batch'
+        assert mock_driver_class.call_count == 3
+    
+    def test_batch_endpoint_applies_shared_options(self, mock_driver_class, client):
+        """Test that other body fields are applied to every URL"""
+        response = client.post('/api/article/batch', json={
+            'urls': ['https://example.com/a', 'https://example.com/b'],
+            'incognito': False
+        })
+        
+        lines = self._read_lines(response)
+        assert len(lines) == 2
+        for call in mock_driver_class.call_args_list:
+            assert not call[1]['incognito']
+    
+    def test_batch_endpoint_accepts_json_typed_options(self, mock_driver_class, mock_driver, client):
+        """Test that options given as JSON numbers and arrays are parsed"""
+        response = client.post('/api/article/batch', json={
+            'urls': ['https://example.com/a'],
+            'timeout': 5000,
+            'resource': ['document', 'script']
+        })
+        
+        lines = self._read_lines(response)
+        assert lines[0]['status'] == 200
+        mock_driver.set_page_load_timeout.assert_called_once_with(5.0)
+        assert mock_driver_class.call_args[1]['block_images']
+    
+    def test_batch_endpoint_reports_per_url_errors(self, mock_driver, client):
+        """Test that a failing URL doesn't fail the whole batch"""
+        def get(url):
+            if url.endswith('/bad'):
+                raise Exception("Connection error")
+        mock_driver.get.side_effect = get
+        
+        response = client.post('/api/article/batch', json={
+            'urls': ['https://example.com/good', 'https://example.com/bad'],
+            'max_concurrency': 1
+        })
+        
+        lines = self._read_lines(response)
+        assert lines[0]['status'] == 200
+        assert lines[1]['status'] == 500
+        assert lines[1]['result']['detail'][0]['type'] == 'fetch_error'
+    
+    def test_batch_endpoint_serves_cached_results(self, mock_driver_class, mock_driver, client):
+        """Test that cached results are included without fetching again"""
+        mock_driver.page_source = '<html><head><title>Cached</title></head><body>Test</body></html>'
+        
+        original = client.get('/api/article?url=https://example.com').get_json()
+        mock_driver_class.reset_mock()
+        
+        response = client.post('/api/article/batch', json={'urls': ['https://example.com'], 'cache': True})
+        
+        lines = self._read_lines(response)
+        assert lines[0]['result'] == original
+        mock_driver_class.assert_not_called()
+
+
+class TestArticleEndpointParsePool:
+    """Test parsing pages in worker processes in /api/article endpoint"""
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_screenshot_parameter_false(self, mock_driver_class):
+    @pytest.fixture
+    def client(self, make_app):
+        """Client for an app with parse workers enabled"""
+        return make_app(parse_workers=1).test_client()
+    
+    def test_article_endpoint_parses_in_worker_process(self, mock_driver, client):
+        """Test that pages parsed by the parse pool give the same result"""
+        mock_driver.page_source = '<html lang="en"><head><title>Pooled</title></head><body><article>Test</article></body></html>'
+        
+        response = client.get('/api/article?url=https://example.com')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['title'] == 'Pooled'
+        assert data['lang'] == 'en'
+        assert data['textContent'] == 'Pooled\nTest'
+
+
+class TestArticleEndpointScreenshot:
+    """Test screenshot functionality in /api/article endpoint"""
+    
+    def test_article_endpoint_screenshot_parameter_false(self, mock_driver, client):
         """Test that screenshot is None when screenshot=false"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
+        response = client.get('/api/article?url=https://example.com')
+        data = response.get_json()
+        
+        assert data['screenshotUri'] is None
+        mock_driver.save_screenshot.assert_not_called()
+    
+    def test_article_endpoint_screenshot_parameter_true(self, mock_driver, client, server_dirs):
+        """Test that a WebP screenshot is taken when screenshot=true"""
+        mock_driver.execute_cdp_cmd.return_value = {'data': base64.b64encode(b'RIFF-webp-data').decode()}
         
-        response = self.client.get('/api/article?url=https://example.com')
-        data = json.loads(response.data)
+        response = client.get('/api/article?url=https://example.com&screenshot=true')
+        data = response.get_json()
         
-        self.assertIsNone(data['screenshotUri'])
+        assert data['screenshotUri'] is not None
+        assert data['screenshotUri'].startswith('/api/screenshot/')
+        mock_driver.execute_cdp_cmd.assert_called_once_with(
+            'Page.captureScreenshot', {'format': 'webp', 'quality': 85}
+        )
         mock_driver.save_screenshot.assert_not_called()
+        
+        screenshot_file = server_dirs.screenshots / (data['screenshotUri'].split('/')[-1] + '.webp')
+        assert screenshot_file.read_bytes() == b'RIFF-webp-data'
     
-    @patch('endpoints.article.Driver')
-    def test_article_endpoint_screenshot_parameter_true(self, mock_driver_class):
-        """Test that screenshot is taken when screenshot=true"""
-        mock_driver = MagicMock()
-        mock_driver_class.return_value = mock_driver
-        mock_driver.current_url = 'https://example.com'
-        mock_driver.page_source = '<html><body>Test</body></html>'
+    def test_article_endpoint_screenshot_falls_back_to_png(self, mock_driver, client):
+        """Test that a PNG screenshot is saved when CDP capture fails"""
+        mock_driver.execute_cdp_cmd.side_effect = Exception("CDP not supported")
         mock_driver.save_screenshot.return_value = True
         
-        response = self.client.get('/api/article?url=https://example.com&screenshot=true')
-        data = json.loads(response.data)
+        response = client.get('/api/article?url=https://example.com&screenshot=true')
+        data = response.get_json()
+        
+        assert data['screenshotUri'] is not None
+        assert data['screenshotUri'].startswith('/api/screenshot/')
+        mock_driver.save_screenshot.assert_called_once()
+    
+    def test_article_endpoint_png_screenshot_replaces_webp(self, mock_driver, client, server_dirs):
+        """Test that a PNG fallback removes the WebP screenshot of an earlier capture"""
+        mock_driver.execute_cdp_cmd.return_value = {'data': base64.b64encode(b'RIFF-webp-data').decode()}
+        data = client.get('/api/article?url=https://example.com&screenshot=true').get_json()
+        webp_file = server_dirs.screenshots / (data['screenshotUri'].split('/')[-1] + '.webp')
+        assert webp_file.exists()
+        
+        mock_driver.execute_cdp_cmd.side_effect = Exception("CDP not supported")
+        client.get('/api/article?url=https://example.com&screenshot=true')
         
-        self.assertIsNotNone(data['screenshotUri'])
-        self.assertTrue(data['screenshotUri'].startswith('file://screenshots/'))
         mock_driver.save_screenshot.assert_called_once()
+        assert not webp_file.exists()
+    
+    def test_article_endpoint_inline_screenshot(self, mock_driver, make_app, server_dirs):
+        """Test that screenshots are embedded as data URIs with screenshot_inline"""
+        app = make_app(screenshot_inline=True)
+        webp_data = base64.b64encode(b'RIFF-webp-data').decode()
+        mock_driver.execute_cdp_cmd.return_value = {'data': webp_data}
+        
+        response = app.test_client().get('/api/article?url=https://example.com&screenshot=true')
+        data = response.get_json()
+        
+        assert data['screenshotUri'] == f'data:image/webp;base64,{webp_data}'
+        assert list(server_dirs.screenshots.iterdir()) == []
+
 
-if __name__ == '__main__':
-    unittest.main()
+class TestScreenshotEndpoint:
+    """Test /api/screenshot endpoint"""
+    
+    def test_screenshot_endpoint_serves_webp(self, client, server_dirs):
+        """Test that a saved screenshot is served with its image type"""
+        (server_dirs.screenshots / 'abc123.webp').write_bytes(b'RIFF-webp-data')
+        
+        response = client.get('/api/screenshot/abc123')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        assert response.data == b'RIFF-webp-data'
+        response.close()
+    
+    def test_screenshot_endpoint_serves_png_fallback(self, client, server_dirs):
+        """Test that PNG screenshots are served when there is no WebP"""
+        (server_dirs.screenshots / 'abc123.png').write_bytes(b'png-data')
+        
+        response = client.get('/api/screenshot/abc123')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'image/png'
+        response.close()
+    
+    def test_screenshot_endpoint_supports_conditional_requests(self, client, server_dirs):
+        """Test that an unchanged screenshot returns 304 Not Modified"""
+        (server_dirs.screenshots / 'abc123.webp').write_bytes(b'RIFF-webp-data')
+        
+        response1 = client.get('/api/screenshot/abc123')
+        etag = response1.headers['ETag']
+        response1.close()
+        response2 = client.get('/api/screenshot/abc123', headers={'If-None-Match': etag})
+        
+        assert response2.status_code == 304
+    
+    def test_screenshot_endpoint_not_found(self, client):
+        """Test that missing or invalid screenshot keys return 404"""
+        for key in ('missing', 'abc123', 'abc123.webp'):
+            response = client.get(f'/api/screenshot/{key}')
+            assert response.status_code == 404
+            data = response.get_json()
+            assert data['detail'][0]['type'] == 'not_found'
+    
+    def test_article_screenshot_uri_is_served(self, mock_driver, client):
+        """Test that the screenshotUri of an article result can be fetched"""
+        mock_driver.execute_cdp_cmd.return_value = {'data': base64.b64encode(b'RIFF-webp-data').decode()}
+        
+        data = client.get('/api/article?url=https://example.com&screenshot=true').get_json()
+        response = client.get(data['screenshotUri'])
+        
+        assert response.status_code == 200
+        assert response.data == b'RIFF-webp-data'
+        response.close()
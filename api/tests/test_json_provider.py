@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the orjson-backed Flask JSON provider in json_provider.py
+"""
+import unittest
+from decimal import Decimal
+from flask import Flask, jsonify, request
+
+from json_provider import ORJSONProvider
+import server
+
+
+class TestORJSONProvider(unittest.TestCase):
+    """Test JSON serialization and parsing through the Flask app"""
+    
+    def setUp(self):
+        """Create an app using the provider"""
+        self.app = Flask(__name__)
+        self.app.json = ORJSONProvider(self.app)
+        
+        @self.app.route('/echo', methods=['POST'])
+        def echo():
+            return jsonify(request.get_json())
+        
+        self.client = self.app.test_client()
+    
+    def test_server_app_uses_provider(self):
+        """Test that the API server serializes JSON with orjson"""
+        self.assertIsInstance(server.app.json, ORJSONProvider)
+    
+    def test_dumps_sorts_keys_by_default(self):
+        """Test that keys are sorted like Flask's default provider"""
+        self.assertEqual(self.app.json.dumps({'b': 1, 'a': 2}), '{"a":2,"b":1}')
+        self.assertEqual(self.app.json.dumps({'b': 1, 'a': 2}, sort_keys=False), '{"b":1,"a":2}')
+    
+    def test_dumps_falls_back_to_flask_default(self):
+        """Test that types orjson doesn't support are serialized like Flask does"""
+        self.assertEqual(self.app.json.dumps({'value': Decimal('1.5')}), '{"value":"1.5"}')
+        self.assertEqual(self.app.json.dumps({1: 'one'}), '{"1":"one"}')
+    
+    def test_request_and_response_round_trip(self):
+        """Test that request bodies are parsed and jsonify() responses serialized"""
+        payload = {'urls': ['https://example.com'], 'text': 'café "quoted"'}
+        
+        response = self.client.post('/echo', json=payload)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.get_json(), payload)
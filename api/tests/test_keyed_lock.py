@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-key lock in keyed_lock.py
+"""
+import unittest
+import threading
+
+from keyed_lock import KeyedLock
+
+
+class TestKeyedLock(unittest.TestCase):
+    """Test locking per key and cleanup of unused locks"""
+    
+    def test_same_key_is_exclusive(self):
+        """Test that a second thread waits for the lock of the same key"""
+        locks = KeyedLock()
+        acquired = threading.Event()
+        
+        def hold_key():
+            with locks.hold('key'):
+                acquired.set()
+        
+        with locks.hold('key'):
+            thread = threading.Thread(target=hold_key)
+            thread.start()
+            self.assertFalse(acquired.wait(0.1))
+        
+        thread.join(1)
+        self.assertTrue(acquired.is_set())
+    
+    def test_different_keys_do_not_block(self):
+        """Test that locks of different keys are independent"""
+        locks = KeyedLock()
+        acquired = threading.Event()
+        
+        def hold_other_key():
+            with locks.hold('other'):
+                acquired.set()
+        
+        with locks.hold('key'):
+            thread = threading.Thread(target=hold_other_key)
+            thread.start()
+            self.assertTrue(acquired.wait(1))
+        
+        thread.join(1)
+    
+    def test_unused_locks_are_removed(self):
+        """Test that a key's lock is dropped once released, even after an error"""
+        locks = KeyedLock()
+        
+        with locks.hold('key'):
+            self.assertEqual(len(locks), 1)
+        with self.assertRaises(ValueError):
+            with locks.hold('key'):
+                raise ValueError("fetch failed")
+        
+        self.assertEqual(len(locks), 0)
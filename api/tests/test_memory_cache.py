@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the in-memory cache in memory_cache.py
+"""
+import unittest
+from unittest.mock import patch
+
+from memory_cache import MemoryCache
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Test in-memory cache lookups, expiry and eviction"""
+    
+    def test_get_returns_cached_value(self):
+        """Test that a cached value is returned"""
+        cache = MemoryCache(max_bytes=100)
+        cache.set('key', b'value')
+        
+        self.assertEqual(cache.get('key', ttl=60), b'value')
+        self.assertIsNone(cache.get('missing', ttl=60))
+    
+    def test_get_drops_expired_value(self):
+        """Test that values older than the TTL are not returned"""
+        cache = MemoryCache(max_bytes=100)
+        cache.set('key', b'value', timestamp=1000.0)
+        
+        with patch('memory_cache.time.time', return_value=1061.0):
+            self.assertIsNone(cache.get('key', ttl=60))
+        self.assertEqual(len(cache), 0)
+    
+    def test_set_evicts_least_recently_used(self):
+        """Test that the least recently used values are evicted to stay within max_bytes"""
+        cache = MemoryCache(max_bytes=10)
+        cache.set('a', b'aaaa')
+        cache.set('b', b'bbbb')
+        cache.get('a', ttl=60)
+        cache.set('c', b'cccc')
+        
+        self.assertEqual(cache.get('a', ttl=60), b'aaaa')
+        self.assertIsNone(cache.get('b', ttl=60))
+        self.assertEqual(cache.get('c', ttl=60), b'cccc')
+    
+    def test_set_replaces_existing_value(self):
+        """Test that setting a key again replaces its value and size"""
+        cache = MemoryCache(max_bytes=10)
+        cache.set('a', b'aaaaaaaa')
+        cache.set('a', b'aa')
+        cache.set('b', b'bbbbbbbb')
+        
+        self.assertEqual(cache.get('a', ttl=60), b'aa')
+        self.assertEqual(cache.get('b', ttl=60), b'bbbbbbbb')
+    
+    def test_set_ignores_values_larger_than_max_bytes(self):
+        """Test that values which can never fit are not cached"""
+        cache = MemoryCache(max_bytes=4)
+        cache.set('small', b'ab')
+        cache.set('large', b'abcdef')
+        
+        self.assertIsNone(cache.get('large', ttl=60))
+        self.assertEqual(cache.get('small', ttl=60), b'ab')
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Unit tests for request parameter parsing in params.py
+"""
+import unittest
+
+from params import ArticleParams
+
+
+class TestArticleParams(unittest.TestCase):
+    """Test parsing request parameters into ArticleParams"""
+    
+    def setUp(self):
+        """Create default parameters"""
+        self.defaults = ArticleParams(
+            cache=False, full_content=False, screenshot=False,
+            user_scripts='', user_scripts_timeout=0, browser=True, text=True,
+            incognito=True, timeout=60000, wait_until='domcontentloaded',
+            sleep=0, resource='', viewport_width=None, viewport_height=None,
+            screen_width=None, screen_height=None, device='Desktop Chrome',
+            scroll_down=0, ignore_https_errors=True, user_agent='',
+            locale='', timezone='', http_credentials='', extra_http_headers=''
+        )
+    
+    def test_from_args_uses_defaults_without_args(self):
+        """Test that defaults are used when no parameters are given"""
+        params = ArticleParams.from_args({}, self.defaults)
+        
+        self.assertEqual(params, self.defaults)
+    
+    def test_from_args_parses_values(self):
+        """Test that query parameters are parsed into typed fields"""
+        params = ArticleParams.from_args({
+            'url': 'https://example.com',
+            'cache': 'true',
+            'incognito': 'false',
+            'timeout': '5000',
+            'viewport-width': '1280',
+            'user-scripts': 'a.js,b.js',
+            'wait-until': 'load',
+        }, self.defaults)
+        
+        self.assertTrue(params.cache)
+        self.assertFalse(params.incognito)
+        self.assertEqual(params.timeout, 5000)
+        self.assertEqual(params.viewport_width, 1280)
+        self.assertIsNone(params.viewport_height)
+        self.assertEqual(params.user_scripts, 'a.js,b.js')
+        self.assertEqual(params.wait_until, 'load')
+    
+    def test_from_args_handles_invalid_and_empty_values(self):
+        """Test that invalid integers fall back to defaults and empty sizes are unset"""
+        params = ArticleParams.from_args({
+            'timeout': 'abc',
+            'viewport-width': 'abc',
+            'viewport-height': '',
+            'resource': '',
+        }, self.defaults)
+        
+        self.assertEqual(params.timeout, 60000)
+        self.assertIsNone(params.viewport_width)
+        self.assertIsNone(params.viewport_height)
+        self.assertEqual(params.resource, '')
+    
+    def test_params_are_immutable(self):
+        """Test that parsed parameters can't be modified"""
+        with self.assertRaises(Exception):
+            self.defaults.timeout = 1
+    
+    def test_cache_query_ignores_cache_flag(self):
+        """Test that the cache flag doesn't change the cache key parameters"""
+        with_cache = ArticleParams.from_args({'cache': 'true'}, self.defaults)
+        
+        self.assertEqual(with_cache.cache_query(), self.defaults.cache_query())
+        self.assertEqual(self.defaults.cache_query()['timeout'], 60000)
+    
+    def test_cache_query_separates_results_fetched_without_browser(self):
+        """Test that browser=false results get their own cache key parameters"""
+        without_browser = ArticleParams.from_args({'browser': 'false'}, self.defaults)
+        
+        self.assertFalse(without_browser.browser)
+        self.assertNotIn('browser', self.defaults.cache_query())
+        self.assertFalse(without_browser.cache_query()['browser'])
+    
+    def test_cache_query_separates_results_without_text(self):
+        """Test that text=false results get their own cache key parameters"""
+        without_text = ArticleParams.from_args({'text': '0'}, self.defaults)
+        
+        self.assertFalse(without_text.text)
+        self.assertNotIn('text', self.defaults.cache_query())
+        self.assertFalse(without_text.cache_query()['text'])